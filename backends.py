@@ -0,0 +1,304 @@
+# backends.py
+"""
+Storage backends for the master log.
+
+Every backend answers the same calls:
+
+    backend.read_rows(start_row)    raw rows from `start_row` down (what Snapshot.sync fetches)
+    backend.append(rows)            appends a list of row dicts or a DataFrame
+    backend.writer()                a write_batch(frame) for bulk imports
+    backend.queries(df, version)    the Dashboard's options / rollup / rows queries
+
+GSheetsBackend is the shared Google Sheet; Dashboard queries run in memory on
+the rollup cube. SQLiteBackend keeps the log in a local SQLite file with
+indexes on the common filter columns, and pushes Dashboard filters and
+group-bys down as SQL so only aggregated rows come back. It runs the app
+offline and at scale:
+
+    ROZALIA_BACKEND=sqlite streamlit run rozalia_app.py
+    python backends.py copy-sheet           # seed the local database from the sheet
+"""
+import argparse
+import contextlib
+import os
+import sqlite3
+import sys
+import threading
+
+import pandas as pd
+
+from config import ALL_COLUMNS, ALL_DEBRIS_ITEMS, SUMMARY_TOTALS
+from filter_index import get_filter_index
+from rollups import COUNT_COL, RollupCube, add_time_dims, get_cube
+from search_index import SEARCH_COLUMNS, get_search_index
+from snapshot import CACHE_DIR, normalize_frame
+from storage import _values_to_frame, append_rows, append_to_worksheet, open_worksheet, read_rows, sync_header
+from units import EFFORT_SUMS, effort_sums
+
+
+BACKEND = os.environ.get("ROZALIA_BACKEND", "gsheets")
+DB_PATH = os.environ.get("ROZALIA_DB", os.path.join(CACHE_DIR, "master_log.db"))
+TABLE = "cleanups"
+INDEXED_COLUMNS = ["Date", "State", "Location", "Type of cleanup"]
+NUMERIC_COLUMNS = ALL_DEBRIS_ITEMS + [t for t in SUMMARY_TOTALS if t != "Outlier"]
+
+MONTHS = ["January", "February", "March", "April", "May", "June",
+          "July", "August", "September", "October", "November", "December"]
+
+
+class FrameQueries:
+    """
+    Dashboard queries answered in memory from the rollup cube and its filter/search
+    indexes. The site box is a "contains" search, matching SQLiteBackend's LIKE.
+    """
+
+    site_mode = "contains"
+
+    def __init__(self, df, version):
+        self.df = df
+        self.version = version
+        self.cube = get_cube(df, version).frame
+        self._index = get_filter_index(self.cube, version, name="cube")
+
+    def _mask(self, selections, site_q=""):
+        mask = get_search_index(self.cube, self.version, name="cube").mask(site_q, self.site_mode)
+        for col, selected in selections.items():
+            if selected:
+                mask = self._index.narrow(mask, col, selected)
+        return mask
+
+    def options(self, column, selections, site_q=""):
+        """Values of `column` still present under the other selections."""
+        return self._index.options(column, self._mask(selections, site_q))
+
+    def rollup(self, selections, by, site_q=""):
+        """Debris sums and cleanup counts per `by` group, as RollupCube.rollup returns them."""
+        mask = self._mask(selections, site_q)
+        return RollupCube.rollup(self.cube if mask is None else self.cube[mask], by)
+
+    def rows(self, selections, site_q=""):
+        """The raw rows behind a selection, with Year/Month added."""
+        mask = get_filter_index(self.df, self.version).mask(selections)
+        site_mask = get_search_index(self.df, self.version).mask(site_q, self.site_mode)
+        if site_mask is not None:
+            mask = site_mask if mask is None else mask & site_mask
+        return add_time_dims(self.df if mask is None else self.df[mask])
+
+
+class GSheetsBackend:
+    """The master Google Sheet, opened as the service account `info` (see storage.service_account_info)."""
+
+    name = "Google Sheets"
+
+    def __init__(self, info, spreadsheet, worksheet=None):
+        self.info = info
+        self.spreadsheet = spreadsheet
+        self.worksheet = worksheet
+
+    def read_rows(self, start_row=2):
+        return read_rows(self.info, self.spreadsheet, start_row, self.worksheet)
+
+    def append(self, rows):
+        return append_rows(self.info, self.spreadsheet, rows, self.worksheet)
+
+    def writer(self):
+        ws = open_worksheet(self.info, self.spreadsheet, self.worksheet)
+        header = sync_header(ws)
+        return lambda rows: append_to_worksheet(ws, rows, header)
+
+    def queries(self, df, version):
+        return FrameQueries(df, version)
+
+
+def _q(name):
+    """Quotes a column name as an SQL identifier."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _dim(column):
+    """SQL expression for a Dashboard dimension; Year and Month are derived from Date like rollups.time_dims."""
+    if column == "Year":
+        return "COALESCE(substr(\"Date\", 1, 4), 'Unknown')"
+    if column == "Month":
+        cases = " ".join(f"WHEN '{i:02d}' THEN '{m}'" for i, m in enumerate(MONTHS, 1))
+        return f"CASE substr(\"Date\", 6, 2) {cases} ELSE 'Unknown' END"
+    return _q(column)
+
+
+class SQLiteBackend:
+    """
+    The master log as one SQLite table, a column per config.ALL_COLUMNS field
+    in insertion order. Dates are stored as YYYY-MM-DD text so Year/Month can
+    be derived in SQL. Each row also stores its units.EFFORT_SUMS, computed on
+    insert, so rollups sum the same normalized effort as the in-memory cube.
+    """
+
+    name = "SQLite"
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.columns = self._ensure_table()
+
+    @contextlib.contextmanager
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def _ensure_table(self):
+        """
+        Creates the table and indexes, adding any config columns it lacks and
+        filling in the effort sums of rows stored before they existed.
+        Returns the sheet column order.
+        """
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(f"CREATE TABLE IF NOT EXISTS {TABLE} (row_id INTEGER PRIMARY KEY AUTOINCREMENT)")
+            existing = [r[1] for r in con.execute(f"PRAGMA table_info({TABLE})")][1:]
+            for col in ALL_COLUMNS:
+                if col not in existing:
+                    kind = "INTEGER" if col in NUMERIC_COLUMNS else "TEXT"
+                    con.execute(f"ALTER TABLE {TABLE} ADD COLUMN {_q(col)} {kind}")
+                    existing.append(col)
+            missing_sums = [c for c in EFFORT_SUMS if c not in existing]
+            for col in missing_sums:
+                con.execute(f"ALTER TABLE {TABLE} ADD COLUMN {_q(col)} REAL")
+            for col in INDEXED_COLUMNS:
+                index = "idx_" + "".join(c if c.isalnum() else "_" for c in col.lower())
+                con.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {TABLE} ({_q(col)})")
+            columns = [c for c in existing if c not in EFFORT_SUMS]
+            if missing_sums:
+                raw = pd.read_sql_query(f"SELECT row_id, {', '.join(_q(c) for c in columns)} FROM {TABLE}", con)
+                if len(raw):
+                    sums = effort_sums(raw.reindex(columns=ALL_COLUMNS))
+                    sets = ", ".join(f"{_q(c)} = ?" for c in EFFORT_SUMS)
+                    con.executemany(f"UPDATE {TABLE} SET {sets} WHERE row_id = ?",
+                                    zip(*(sums[c].tolist() for c in EFFORT_SUMS), raw["row_id"].tolist()))
+        return columns
+
+    def read_rows(self, start_row=2):
+        """Rows in insertion order from sheet-style `start_row` (row 2 is the first record)."""
+        cols = ", ".join(_q(c) for c in self.columns)
+        sql = f"SELECT {cols} FROM {TABLE} ORDER BY row_id LIMIT -1 OFFSET ?"
+        with self._connect() as con:
+            return pd.read_sql_query(sql, con, params=[max(start_row - 2, 0)])
+
+    def append(self, rows):
+        if len(rows) == 0:
+            return 0
+        frame = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+        frame = frame.copy()
+        if "Date" in frame.columns:
+            dates = pd.to_datetime(frame["Date"], errors="coerce", format="mixed")
+            frame["Date"] = dates.dt.strftime("%Y-%m-%d").where(dates.notna(), frame["Date"])
+        if "State" in frame.columns:
+            frame["State"] = frame["State"].astype("string").str.upper()
+        frame = frame.reindex(columns=self.columns)
+        sums = effort_sums(frame.reindex(columns=ALL_COLUMNS))
+        frame = frame.astype(object)
+        frame = frame.where(frame.notna() & (frame != ""), None)
+        frame[EFFORT_SUMS] = sums
+        values = frame.itertuples(index=False, name=None)
+
+        columns = self.columns + EFFORT_SUMS
+        cols = ", ".join(_q(c) for c in columns)
+        marks = ", ".join("?" * len(columns))
+        with self._lock, self._connect() as con:
+            con.executemany(f"INSERT INTO {TABLE} ({cols}) VALUES ({marks})", values)
+        return len(frame)
+
+    def writer(self):
+        return self.append
+
+    def queries(self, df, version):
+        return self
+
+    # --- DASHBOARD QUERIES (pushed down) ---
+    def _where(self, selections, site_q=""):
+        clauses, params = [], []
+        for col, selected in selections.items():
+            if selected:
+                clauses.append(f"{_dim(col)} IN ({', '.join('?' * len(selected))})")
+                params += [str(v) for v in selected]
+        if site_q:
+            pattern = "%" + site_q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            clauses.append("(" + " OR ".join(f"{_q(c)} LIKE ? ESCAPE '\\'" for c in SEARCH_COLUMNS) + ")")
+            params += [pattern] * len(SEARCH_COLUMNS)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def options(self, column, selections, site_q=""):
+        """Distinct values of `column` under the selections (other than its own); the site search is a LIKE match."""
+        where, params = self._where(selections, site_q)
+        where = (where + " AND " if where else "WHERE ") + f"{_dim(column)} IS NOT NULL"
+        sql = f"SELECT DISTINCT {_dim(column)} FROM {TABLE} {where} ORDER BY 1"
+        with self._connect() as con:
+            return [str(r[0]) for r in con.execute(sql, params)]
+
+    def rollup(self, selections, by, site_q=""):
+        """GROUP BY in the database; returns the same columns as RollupCube.rollup."""
+        where, params = self._where(selections, site_q)
+        dims = [f"{_dim(c)} AS {_q(c)}" for c in by]
+        sums = [f"COALESCE(SUM({_q(i)}), 0) AS {_q(i)}" for i in ALL_DEBRIS_ITEMS + EFFORT_SUMS]
+        group = ", ".join(str(i) for i in range(1, len(by) + 1))
+        sql = (f"SELECT {', '.join(dims + sums)}, COUNT(*) AS {_q(COUNT_COL)} FROM {TABLE} {where} "
+               f"GROUP BY {group} ORDER BY {group}")
+        with self._connect() as con:
+            grouped = pd.read_sql_query(sql, con, params=params)
+        labels = [grouped[col].astype("string").fillna("Unknown") for col in by]
+        x_axis = labels[0]
+        for label in labels[1:]:
+            x_axis = x_axis + " | " + label
+        grouped.insert(0, "X_Axis", x_axis)
+        return grouped
+
+    def rows(self, selections, site_q=""):
+        where, params = self._where(selections, site_q)
+        cols = ", ".join(_q(c) for c in self.columns)
+        with self._connect() as con:
+            raw = pd.read_sql_query(f"SELECT {cols} FROM {TABLE} {where} ORDER BY row_id", con, params=params)
+        return add_time_dims(normalize_frame(raw))
+
+
+_LOCAL = {}
+_LOCAL_LOCK = threading.Lock()
+
+
+def get_local_backend(path=DB_PATH):
+    """The shared SQLiteBackend for `path`, created (with its table) on first use."""
+    with _LOCAL_LOCK:
+        if path not in _LOCAL:
+            _LOCAL[path] = SQLiteBackend(path)
+        return _LOCAL[path]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the local SQLite copy of the master log.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    copy = sub.add_parser("copy-sheet", help="append every row of the Google Sheet to the local database")
+    copy.add_argument("--db", default=DB_PATH)
+    load = sub.add_parser("load", help="append the rows of a CSV/Parquet export to the local database")
+    load.add_argument("path")
+    load.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args(argv)
+
+    backend = SQLiteBackend(args.db)
+    if args.command == "copy-sheet":
+        from storage import open_worksheet_from_secrets
+
+        values = open_worksheet_from_secrets().get_all_values()
+        rows = _values_to_frame(values[0], values[1:]) if values else pd.DataFrame()
+    elif args.path.endswith(".parquet"):
+        rows = pd.read_parquet(args.path)
+    else:
+        rows = pd.read_csv(args.path, dtype=str, keep_default_na=False)
+    print(f"{backend.append(rows):,} rows written to {args.db}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+# bench.py
+"""
+Benchmarks for the data path on synthetic cleanups, no network needed.
+
+A generator makes realistic rows for config.ALL_COLUMNS (a few busy states,
+Zipf-weighted cities and sites, dates across a decade, sparse Poisson-like
+debris counts) and serves them through LocalSheet, a stand-in for the Google
+Sheet with the same read_rows(start_row) contract. Each scenario runs the
+code the app runs (snapshot sync, outlier flags, each Dashboard filter step,
+the chart aggregations, CSV export) a few times and reports the median time
+and, with --memory, the peak traced allocation.
+
+    python bench.py --sizes 1k,10k,100k
+    python bench.py --sizes 100k --save-baseline bench_baseline.json
+    python bench.py --sizes 100k --baseline bench_baseline.json
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from config import ALL_COLUMNS, ALL_DEBRIS_ITEMS, DROPDOWN_OPTIONS
+from rollups import TYPE_LOC_COL
+from totals import TOTAL_COLUMNS, compute_totals
+
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1M": 1_000_000}
+DEFAULT_SIZES = "1k,10k,100k"
+REPEAT = 3
+REGRESSION_RATIO = 1.25   # slower than baseline by more than this counts as a regression
+
+STATE_WEIGHTS = {"MA": 0.45, "RI": 0.15, "CT": 0.1, "NY": 0.08, "ME": 0.07, "NH": 0.05, "NJ": 0.04, "FL": 0.03, "CA": 0.03}
+TYPE_LOC = ["Sandy Beach", "Rocky Shore", "Marina", "Open Water", "Riverbank", "Salt Marsh"]
+
+
+def _zipf(rng, n_values, size, a=1.1):
+    """Indexes 0..n_values-1 drawn with Zipf-like weights (a few values very common)."""
+    weights = 1.0 / np.arange(1, n_values + 1) ** a
+    return rng.choice(n_values, size=size, p=weights / weights.sum())
+
+
+def generate_rows(n, seed=0):
+    """`n` synthetic cleanups laid out like the sheet (config.ALL_COLUMNS, totals filled in)."""
+    rng = np.random.default_rng(seed)
+    n_cities = int(min(800, max(20, n // 50)))
+    n_sites = int(min(5000, max(50, n // 10)))
+    n_orgs = int(min(1500, max(20, n // 40)))
+
+    states = rng.choice(list(STATE_WEIGHTS), size=n, p=np.array(list(STATE_WEIGHTS.values())))
+    city_ids = _zipf(rng, n_cities, n)
+    site_ids = city_ids * 7 + _zipf(rng, max(n_sites // n_cities, 1), n)
+    org_ids = _zipf(rng, n_orgs, n)
+    days = rng.integers(0, 13 * 365, n)
+    dates = pd.Timestamp("2013-01-01") + pd.to_timedelta(days, unit="D")
+    stamps = dates + pd.to_timedelta(rng.integers(0, 30 * 86400, n), unit="s")
+
+    rows = {
+        "Date": dates.strftime("%Y-%m-%d"),
+        "Submission Timestamp": stamps.strftime("%Y-%m-%d %H:%M:%S"),
+        "Location": pd.Index([f"Site {i}" for i in range(site_ids.max() + 1)])[site_ids],
+        "Name of Organization/Individual": pd.Index([f"Group {i}" for i in range(n_orgs)])[org_ids],
+        "Email": pd.Index([f"group{i}@example.org" for i in range(n_orgs)])[org_ids],
+        "City": pd.Index([f"Town {i}" for i in range(n_cities)])[city_ids],
+        "State": states,
+        "Country": np.full(n, "USA"),
+        "Type of cleanup": rng.choice(DROPDOWN_OPTIONS["Type of cleanup"], size=n, p=[0.8, 0.1, 0.1]),
+        TYPE_LOC_COL: rng.choice(TYPE_LOC, size=n),
+        "Distance cleaned": rng.gamma(2.0, 0.5, n).round(1),
+        "Units (Distance cleaned)": np.full(n, "Miles"),
+        "Duration (hrs)": rng.choice([1.0, 1.5, 2.0, 3.0], size=n),
+        "Start time": rng.choice(DROPDOWN_OPTIONS["Start time"][32:64], size=n),
+        "Total weight": rng.gamma(1.5, 10, n).round(1),
+        "Units (Total weight)": np.full(n, "lbs"),
+        "# of participants": rng.integers(1, 40, n),
+        "Unusual items": np.where(rng.random(n) < 0.05, "Message in a bottle", ""),
+        "Notes/comments": np.where(rng.random(n) < 0.2, "Windy, high tide", ""),
+    }
+    # Most items are absent from most cleanups; present ones follow a Poisson around an item-specific rate
+    rates = rng.lognormal(1.0, 1.2, len(ALL_DEBRIS_ITEMS))
+    presence = rng.random(len(ALL_DEBRIS_ITEMS)) * 0.5
+    for item, rate, p in zip(ALL_DEBRIS_ITEMS, rates, presence):
+        counts = rng.poisson(rate, n) * (rng.random(n) < p)
+        spikes = rng.random(n) < 0.001  # the odd huge cleanup, for the outlier pass
+        rows[item] = np.where(spikes, counts * 50 + 100, counts)
+
+    df = pd.DataFrame(rows)
+    df[TOTAL_COLUMNS] = compute_totals(df)
+    df["Outlier"] = ""
+    return df.reindex(columns=ALL_COLUMNS)
+
+
+class LocalSheet:
+    """In-memory stand-in for the master sheet: append-only rows with storage.read_rows' contract."""
+
+    def __init__(self, rows):
+        self.rows = rows.reset_index(drop=True)
+
+    def read_rows(self, start_row=2):
+        out = self.rows.iloc[max(start_row - 2, 0):].reset_index(drop=True)
+        return out.replace("", np.nan)
+
+    def append(self, rows):
+        rows = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+        self.rows = pd.concat([self.rows, rows.reindex(columns=ALL_COLUMNS)], ignore_index=True)
+        return len(rows)
+
+
+def _timed(fn, repeat, memory, setup=None):
+    """Median/min seconds of `fn()` (or `fn(setup())`, with setup untimed) over `repeat` runs."""
+    times = []
+    for _ in range(repeat + memory):
+        args = (setup(),) if setup else ()
+        if len(times) == repeat:
+            tracemalloc.start()
+        start = time.perf_counter()
+        fn(*args)
+        elapsed = time.perf_counter() - start
+        if len(times) == repeat:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            times.append(elapsed)
+    result = {"seconds": statistics.median(times), "min_seconds": min(times)}
+    if memory:
+        result["peak_mb"] = peak / 1e6
+    return result
+
+
+def run_size(n, repeat=REPEAT, memory=False, seed=0):
+    """Runs every scenario on `n` synthetic rows; returns {scenario: result}."""
+    import sites
+    import snapshot
+    from backends import FrameQueries
+    from filter_index import FILTER_COLUMNS
+    from outliers import outlier_flags
+    from paging import export_csv, sort_order
+    from rollups import material_totals, subcategory_counts
+
+    sheet = LocalSheet(generate_rows(n, seed))
+    cache_dir = tempfile.mkdtemp(prefix="rozalia-bench-")
+    shared_dictionary = sites._DICTIONARY
+    sites._DICTIONARY = sites.SiteDictionary(os.path.join(cache_dir, "site_dictionary.json"), seed=None)  # keep synthetic sites out of the real one
+    results = {}
+    try:
+        def full_sync():
+            snapshot.Snapshot(cache_dir).sync(sheet.read_rows, force=True)
+        results["load: full sync + normalize"] = _timed(full_sync, repeat, memory)
+
+        results["load: warm start (parquet)"] = _timed(lambda: snapshot.Snapshot(cache_dir), repeat, memory)
+
+        df = snapshot.Snapshot(cache_dir).frame
+        grown = LocalSheet(sheet.rows)
+        grown.append(generate_rows(max(n // 100, 10), seed + 1))
+
+        def loaded_snapshot():
+            run_dir = tempfile.mkdtemp(dir=cache_dir)
+            shutil.copytree(cache_dir, run_dir, dirs_exist_ok=True, ignore=shutil.ignore_patterns("tmp*"))
+            s = snapshot.Snapshot(run_dir)
+            s.mark_stale()
+            return s
+        results["load: delta sync (1% new rows)"] = _timed(
+            lambda s: s.sync(grown.read_rows), repeat, memory, setup=loaded_snapshot)
+
+        # fresh version tokens so per-version caches are built inside the timed call
+        counter = iter(range(10 ** 9))
+        results["outliers: flag all rows"] = _timed(
+            lambda: outlier_flags(df, f"bench-out-{next(counter)}"), repeat, memory)
+        results["dashboard: build cube + indexes"] = _timed(
+            lambda: FrameQueries(df, f"bench-cube-{next(counter)}"), repeat, memory)
+
+        queries = FrameQueries(df, "bench")
+        selections = {}
+        for col in FILTER_COLUMNS:
+            options = queries.options(col, selections)
+            results[f"filter: {col.split(' (')[0]}"] = _timed(lambda: queries.options(col, selections), repeat, memory)
+            if len(options) > 1:
+                selections[col] = options[:max(1, len(options) // 2)]
+        broad = {"State": selections.get("State", [])}
+
+        g_df = queries.rollup(broad, ["Year"])
+        results["chart: rollup by Year"] = _timed(lambda: queries.rollup(broad, ["Year"]), repeat, memory)
+        results["chart: material stacked bar"] = _timed(lambda: material_totals(g_df), repeat, memory)
+        results["chart: subcategory melt"] = _timed(lambda: subcategory_counts(g_df, "Plastic"), repeat, memory)
+        results["dashboard: preview rows"] = _timed(lambda: queries.rows(broad), repeat, memory)
+
+        order = sort_order(df, "bench", "Date", False)
+        results["history: CSV export"] = _timed(lambda: export_csv(df, order), repeat, memory)
+    finally:
+        sites._DICTIONARY = shared_dictionary
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline, ratio=REGRESSION_RATIO):
+    """Lines of 'size scenario: now vs baseline' plus the number of regressions."""
+    lines, regressions = [], 0
+    for size, scenarios in results.items():
+        for name, res in scenarios.items():
+            base = baseline.get(size, {}).get(name)
+            if base is None:
+                continue
+            change = res["seconds"] / base["seconds"] if base["seconds"] else float("inf")
+            flag = "  REGRESSION" if change > ratio else ""
+            regressions += bool(flag)
+            lines.append(f"{size:>5} {name:<44} {res['seconds'] * 1e3:10.1f} ms vs {base['seconds'] * 1e3:10.1f} ms"
+                         f"  ({change:5.2f}x){flag}")
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the data path on synthetic cleanups.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"comma-separated, from {', '.join(SIZES)}")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--memory", action="store_true", help="also record peak traced memory (one extra run each)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save-baseline", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a JSON file from --save-baseline")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for size in args.sizes.split(","):
+        size = size.strip()
+        print(f"--- {size} rows ---")
+        results[size] = run_size(SIZES[size], args.repeat, args.memory, args.seed)
+        for name, res in results[size].items():
+            peak = f"  peak {res['peak_mb']:8.1f} MB" if "peak_mb" in res else ""
+            print(f"{name:<44} {res['seconds'] * 1e3:10.1f} ms{peak}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            lines, regressions = compare(results, json.load(f))
+        print("\n".join(["--- vs baseline ---"] + lines))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
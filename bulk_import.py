@@ -0,0 +1,263 @@
+# bulk_import.py
+"""
+Bulk import of historical cleanup spreadsheets (CSV or XLSX).
+
+Files are streamed in chunks: each chunk has its headers mapped onto
+config.ALL_COLUMNS, is validated column-wise (required fields, dropdown
+values, numeric counts), gets its summary totals computed and is handed to
+a writer in batches, flagged against the archive's outlier thresholds when a
+detector is given. Only one chunk is in memory at a time, so large files
+import with bounded memory. Used by the "Bulk Import" page and from the
+command line:
+
+    python bulk_import.py cleanups_2019.xlsx --dry-run --rejects rejects.csv
+    python bulk_import.py cleanups_2019.xlsx
+    python bulk_import.py cleanups_2019.xlsx --db .cache/master_log.db
+"""
+import argparse
+import re
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+from config import ALL_COLUMNS, ALL_DEBRIS_ITEMS, DROPDOWN_OPTIONS, METADATA_FIELDS, REQUIRED_FIELDS
+from totals import TOTAL_COLUMNS, compute_totals
+
+
+CHUNK_ROWS = 5000         # rows read and validated at a time
+WRITE_BATCH_ROWS = 1000   # rows per append request
+MAX_KEPT_REJECTS = 1000   # rejected rows kept in the report for display/download
+IGNORED_COLUMNS = {"year", "month", "day", "outlier"}
+
+
+def _header_key(name):
+    return re.sub(r"\s+", " ", str(name)).strip().lower()
+
+
+_COLUMN_KEYS = {_header_key(c): c for c in ALL_COLUMNS}
+
+
+def map_headers(columns):
+    """
+    Maps file headers onto config.ALL_COLUMNS ignoring case and extra whitespace.
+    Returns ({file column: master column}, [unrecognized columns]).
+    """
+    mapping, unknown = {}, []
+    for col in columns:
+        key = _header_key(col)
+        if key in _COLUMN_KEYS and _COLUMN_KEYS[key] not in mapping.values():
+            mapping[col] = _COLUMN_KEYS[key]
+        elif key and key not in IGNORED_COLUMNS and not key.startswith("unnamed:"):
+            unknown.append(col)
+    return mapping, unknown
+
+
+def iter_chunks(source, name=None, chunk_rows=CHUNK_ROWS):
+    """Yields the file as DataFrames of at most `chunk_rows` rows, every cell as a string."""
+    name = name or getattr(source, "name", str(source))
+    if str(name).lower().endswith((".xlsx", ".xlsm")):
+        from openpyxl import load_workbook
+
+        wb = load_workbook(source, read_only=True, data_only=True)
+        try:
+            rows = wb.worksheets[0].iter_rows(values_only=True)
+            header = [str(h) if h is not None else "" for h in next(rows, [])]
+            batch = []
+            for row in rows:
+                batch.append(["" if v is None else str(v) for v in row[:len(header)]])
+                if len(batch) == chunk_rows:
+                    yield pd.DataFrame(batch, columns=header)
+                    batch = []
+            if batch:
+                yield pd.DataFrame(batch, columns=header)
+        finally:
+            wb.close()
+    else:
+        # blank lines are kept (and dropped as empty rows later) so row numbers match the file's lines
+        yield from pd.read_csv(source, chunksize=chunk_rows, dtype=str, keep_default_na=False,
+                               skip_blank_lines=False)
+
+
+def prepare_chunk(chunk, mapping, first_row=2):
+    """
+    Validates one chunk and lays it out like the master log.
+
+    Returns (accepted, rejected): accepted has config.ALL_COLUMNS with totals
+    filled in; rejected holds the original values plus "Row" (line in the file)
+    and "Reason".
+    """
+    chunk = chunk.reset_index(drop=True)
+    rows = chunk.rename(columns=mapping).reindex(columns=ALL_COLUMNS)
+    rows[METADATA_FIELDS] = rows[METADATA_FIELDS].apply(lambda s: s.astype("string").str.strip())
+    rows = rows.replace("", pd.NA)
+    rows = rows.dropna(how="all")
+    chunk = chunk.loc[rows.index]
+
+    reasons = pd.Series("", index=rows.index)
+
+    def reject(mask, message):
+        nonlocal reasons
+        reasons = reasons.mask(mask, reasons + message + "; ")
+
+    for field in REQUIRED_FIELDS:
+        reject(rows[field].isna(), f"missing {field}")
+
+    dates = pd.to_datetime(rows["Date"], errors="coerce", format="mixed")
+    reject(rows["Date"].notna() & dates.isna(), "unreadable Date")
+
+    rows["State"] = rows["State"].str.upper()
+    for field, options in DROPDOWN_OPTIONS.items():
+        reject(rows[field].notna() & ~rows[field].isin(options), f"invalid {field}")
+
+    try:
+        counts = rows[ALL_DEBRIS_ITEMS].astype("float64")
+    except (TypeError, ValueError):
+        # something isn't a number; find out which cells column by column
+        counts = rows[ALL_DEBRIS_ITEMS].apply(pd.to_numeric, errors="coerce")
+    bad_counts = (rows[ALL_DEBRIS_ITEMS].notna() & counts.isna()) | (counts < 0)
+    reject(bad_counts.any(axis=1), "non-numeric or negative counts")
+
+    ok = reasons == ""
+    rejected = chunk[~ok].copy()
+    rejected.insert(0, "Reason", reasons[~ok].str.rstrip("; "))
+    rejected.insert(0, "Row", rejected.index + first_row)
+
+    accepted = rows[ok].copy()
+    accepted["Date"] = dates[ok].dt.strftime("%Y-%m-%d")
+    counts = counts[ok].fillna(0)
+    if (counts % 1 == 0).all().all():
+        counts = counts.astype("int64")
+    accepted[ALL_DEBRIS_ITEMS] = counts
+    accepted[TOTAL_COLUMNS] = compute_totals(accepted)
+    accepted["Submission Timestamp"] = accepted["Submission Timestamp"].fillna(
+        datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    )
+    accepted[METADATA_FIELDS] = accepted[METADATA_FIELDS].fillna("None")
+    return accepted, rejected
+
+
+class ImportReport:
+    """Running tally of an import; keeps the first MAX_KEPT_REJECTS rejected rows."""
+
+    def __init__(self):
+        self.rows_read = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.mapping = {}
+        self.unknown_columns = []
+        self._rejects = []
+
+    def add_rejects(self, rejected):
+        self.rejected += len(rejected)
+        kept = sum(len(r) for r in self._rejects)
+        if kept < MAX_KEPT_REJECTS:
+            self._rejects.append(rejected.head(MAX_KEPT_REJECTS - kept))
+
+    @property
+    def rejects(self):
+        return pd.concat(self._rejects, ignore_index=True) if self._rejects else pd.DataFrame(columns=["Row", "Reason"])
+
+    def summary(self):
+        return f"{self.rows_read:,} rows read, {self.accepted:,} imported, {self.rejected:,} rejected"
+
+
+def run_import(source, write_batch, name=None, chunk_rows=CHUNK_ROWS, batch_rows=WRITE_BATCH_ROWS,
+               detector=None, on_rejects=None, on_progress=None):
+    """
+    Streams `source` through validation and hands accepted rows to
+    `write_batch(frame)` at most `batch_rows` at a time.
+    `detector` (an outliers.OutlierDetector fitted on the archive) fills in the Outlier column.
+    `on_rejects(rejected_frame)` sees every rejected chunk (e.g. to write them to disk),
+    `on_progress(report)` is called after each chunk.
+    """
+    report = ImportReport()
+    first_row = 2
+    for chunk in iter_chunks(source, name=name, chunk_rows=chunk_rows):
+        if not report.mapping:
+            report.mapping, report.unknown_columns = map_headers(chunk.columns)
+            missing = [f for f in REQUIRED_FIELDS if f not in report.mapping.values()]
+            if missing:
+                raise ValueError(f"File has no column for required field(s): {', '.join(missing)}")
+
+        accepted, rejected = prepare_chunk(chunk, report.mapping, first_row)
+        first_row += len(chunk)
+        report.rows_read += len(accepted) + len(rejected)
+        if detector is not None and len(accepted):
+            accepted["Outlier"] = detector.flag(accepted)
+
+        for start in range(0, len(accepted), batch_rows):
+            batch = accepted.iloc[start:start + batch_rows]
+            write_batch(batch)
+            report.accepted += len(batch)
+
+        if len(rejected):
+            report.add_rejects(rejected)
+            if on_rejects:
+                on_rejects(rejected)
+        if on_progress:
+            on_progress(report)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import a CSV/XLSX of historical cleanups into the master log.")
+    parser.add_argument("path")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="validate only, don't write to the sheet (rows aren't outlier-flagged)")
+    parser.add_argument("--rejects", help="write rejected rows (with reasons) to this CSV")
+    parser.add_argument("--accepted", help="also write accepted rows to this CSV")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--db", help="write to this local SQLite database instead of the sheet")
+    args = parser.parse_args(argv)
+
+    writers, archive = [], None
+    if not args.dry_run and args.db:
+        from backends import SQLiteBackend
+
+        backend = SQLiteBackend(args.db)
+        archive = backend.read_rows()
+        writers.append(backend.writer())
+    elif not args.dry_run:
+        from storage import _values_to_frame, append_to_worksheet, open_worksheet_from_secrets, sync_header
+
+        ws = open_worksheet_from_secrets()
+        values = ws.get_all_values()
+        archive = _values_to_frame(values[0], values[1:]) if values else None
+        header = sync_header(ws)
+        writers.append(lambda rows: append_to_worksheet(ws, rows, header))
+    detector = None
+    if archive is not None and len(archive):
+        from outliers import OutlierDetector
+
+        detector = OutlierDetector().fit(archive)
+    if args.accepted:
+        first = [True]
+
+        def write_accepted(rows):
+            rows.to_csv(args.accepted, mode="w" if first[0] else "a", header=first[0], index=False)
+            first[0] = False
+        writers.append(write_accepted)
+
+    first_rej = [True]
+
+    def write_rejects(rejected):
+        rejected.to_csv(args.rejects, mode="w" if first_rej[0] else "a", header=first_rej[0], index=False)
+        first_rej[0] = False
+    on_rejects = write_rejects if args.rejects else None
+
+    def write_batch(rows):
+        for w in writers:
+            w(rows)
+
+    report = run_import(args.path, write_batch, chunk_rows=args.chunk_rows, detector=detector,
+                        on_rejects=on_rejects, on_progress=lambda r: print(f"\r{r.summary()}", end="", file=sys.stderr))
+    print(file=sys.stderr)
+    if report.unknown_columns:
+        print(f"Ignored columns: {', '.join(map(str, report.unknown_columns))}")
+    print(report.summary())
+    return 0 if report.rejected == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+# chart_cache.py
+"""
+Process-wide LRU cache for Dashboard aggregations and finished figures.
+
+Keys are a hash of the data version plus the Dashboard state that produced
+the value (filter selections, group-bys, site search, chart type), so any
+session asking for the same view reuses the frame or figure another one
+built, and toggling a chart type or subcategory back and forth is a lookup.
+Entries are evicted least-recently-used once their estimated size passes
+MAX_BYTES. Cached values are shared: treat them as read-only.
+
+    key = cache_key("rollup", version, filter_state(selections), by, site_q)
+    g_df = cached(key, lambda: queries.rollup(selections, by, site_q))
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+MAX_BYTES = int(float(os.environ.get("ROZALIA_CHART_CACHE_MB", 128)) * 1e6)
+
+
+def filter_state(selections):
+    """Canonical form of multiselect selections: empty ones dropped, values sorted."""
+    return {col: sorted(map(str, values)) for col, values in selections.items() if values}
+
+
+def cache_key(*parts):
+    """Stable hash of JSON-able key parts (dict order doesn't matter, list order does)."""
+    blob = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(blob.encode()).hexdigest()
+
+
+def _size(value):
+    """Rough size in bytes: deep memory for frames, JSON length for figures."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if hasattr(value, "to_json"):
+        return len(value.to_json())
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """Thread-safe LRU map bounded by the summed size of its values."""
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value):
+        size = _size(value)
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return value
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.bytes, "hits": self.hits, "misses": self.misses}
+
+
+_CACHE = LRUCache()
+_MISSING = object()
+
+
+def cached(key, build):
+    """
+    The value stored under `key`, calling `build()` and storing the result on a
+    miss. A None result (e.g. no figure for an empty view) is cached like any other.
+    """
+    value = _CACHE.get(key, _MISSING)
+    if value is _MISSING:
+        value = _CACHE.put(key, build())
+    return value
+
+
+def cache_stats():
+    return _CACHE.stats()
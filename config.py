@@ -22,6 +22,8 @@ METADATA_FIELDS = [
     "Notes/comments"
 ]
 
+REQUIRED_FIELDS = ["Date", "Location", "City", "State", "Country", "Name of Organization/Individual", "Email"]
+
 DEBRIS_GROUPS = {
     "Plastic": [
         "Plastic drink bottles", "Food wrappers", "Plastic grocery bags", 
@@ -69,6 +71,9 @@ DEBRIS_GROUPS = {
     ]
 }
 
+# Every debris item, in form/sheet order
+ALL_DEBRIS_ITEMS = [item for group in DEBRIS_GROUPS.values() for item in group]
+
 SUMMARY_TOTALS = [
     "Total Plastic Items (excluding Foam)", 
     "Total Foam Items", 
@@ -85,6 +90,22 @@ SUMMARY_TOTALS = [
     "Outlier"
 ]
 
+# Debris items each summary total adds up ("Outlier" is a flag, not a total)
+SUMMARY_TOTAL_SOURCES = {
+    "Total Plastic Items (excluding Foam)": DEBRIS_GROUPS["Plastic"],
+    "Total Foam Items": DEBRIS_GROUPS["Foam"],
+    "Total PPE Items": DEBRIS_GROUPS["PPE"],
+    "Total Metal Items": DEBRIS_GROUPS["Metal"],
+    "Total Glass/Rubber Items": DEBRIS_GROUPS["Glass & Rubber"],
+    "Total Paper/Cloth Items": DEBRIS_GROUPS["Paper & Cloth"],
+    "Total Fishing Debris Items": DEBRIS_GROUPS["Fishing Debris"],
+    "Total Plastic Fragments (> 30mm)": ["LARGE plastic >30mm"],
+    "Total Plastic Fragments (5-30mm)": ["SMALL plastic 5-30mm"],
+    "Total Microplastics (0-5mm)": ["Micro plastic 0-5mm"],
+    "Total Misc": DEBRIS_GROUPS["Miscellaneous"],
+    "Total (All)": ALL_DEBRIS_ITEMS,
+}
+
 DROPDOWN_OPTIONS = {
     "State": ["N/A","AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "FL", "GA", "HI", "ID", "IL", "IN", "IA", "KS", "KY", "LA", "ME", "MD", "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH", "NJ", "NM", "NY", "NC", "ND", "OH", "OK", "OR", "PA", "RI", "SC", "SD", "TN", "TX", "UT", "VT", "VA", "WA", "WV", "WI", "WY"],
     "Type of cleanup": ["Beach/Shoreline", "Underwater", "Water Surface"],
@@ -96,4 +117,4 @@ DROPDOWN_OPTIONS = {
     ]
 }
 
-ALL_COLUMNS = METADATA_FIELDS + [item for sublist in DEBRIS_GROUPS.values() for item in sublist] + SUMMARY_TOTALS
\ No newline at end of file
+ALL_COLUMNS = METADATA_FIELDS + ALL_DEBRIS_ITEMS + SUMMARY_TOTALS
\ No newline at end of file
@@ -0,0 +1,166 @@
+# filter_index.py
+"""
+Inverted index over the Dashboard filter columns.
+
+For each column every distinct value maps to the sorted list of row ids that
+hold it (stored CSR-style: one argsort of the column's codes plus offsets).
+A multiselect becomes a row bitmap built from those lists, filters combine by
+AND-ing bitmaps, and the options still available under the current selection
+come from counting codes under the bitmap, so no step rescans or re-sorts the
+column strings. Built once per data version; appended rows extend it.
+
+    idx = get_filter_index(df, version)
+    mask = idx.mask({"State": ["MA"], "Year": ["2023"]})
+    idx.options("City", mask)   # cities present in MA during 2023
+    idx.select(df, {"State": ["MA"]})
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from rollups import ORG_COL, TYPE_LOC_COL, time_dims
+from sites import FIELDS as SITE_FIELDS, get_dictionary
+from snapshot import register_append_hook
+
+# In the order the Dashboard's STEP 1 cascades through them
+FILTER_COLUMNS = ["State", "City", "Location", "Year", "Month", "Type of cleanup", TYPE_LOC_COL, ORG_COL]
+
+
+def filter_columns(frame, columns=FILTER_COLUMNS):
+    """
+    The filter columns of `frame`, deriving Year/Month from Date when the frame
+    doesn't have them. Site columns stored with IDs are indexed on those IDs.
+    """
+    out = {c: frame[c] for c in columns if c in frame.columns}
+    for col, id_col in SITE_FIELDS.items():
+        if col in out and id_col in frame.columns:
+            out[col] = site_codes(frame[id_col], col)
+    if ("Year" in columns or "Month" in columns) and "Year" not in frame.columns:
+        out["Year"], out["Month"] = time_dims(frame["Date"])
+    return out
+
+
+def site_codes(ids, field):
+    """A categorical whose codes are the site dictionary IDs and whose categories are the canonical names."""
+    names = get_dictionary().fields[field].names
+    codes = np.asarray(ids.astype("Int64").fillna(-1), dtype=np.int64)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=names[:max(codes.max(initial=-1) + 1, 0)]), index=ids.index)
+
+
+class ColumnIndex:
+    """Value -> row ids for one column. Missing values get no posting list."""
+
+    def __init__(self, values):
+        cat = values.astype("category") if not isinstance(values.dtype, pd.CategoricalDtype) else values
+        self._set(cat.cat.categories.astype(str).to_numpy(dtype=object), cat.cat.codes.to_numpy().astype(np.int32))
+
+    def _set(self, labels, codes):
+        self.labels = labels
+        self.codes = codes
+        self._lookup = {label: i for i, label in enumerate(labels)}
+        order = np.argsort(codes, kind="stable")
+        self._order = order[int((codes < 0).sum()):]  # NA codes (-1) sort first
+        counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+        self._offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    def rows(self, selected, n_rows=None):
+        """Row bitmap for rows whose value is any of `selected`."""
+        mask = np.zeros(len(self.codes) if n_rows is None else n_rows, dtype=bool)
+        for label in selected:
+            code = self._lookup.get(str(label))
+            if code is not None:
+                mask[self._order[self._offsets[code]:self._offsets[code + 1]]] = True
+        return mask
+
+    def present(self, mask=None):
+        """Sorted values that occur in the rows selected by `mask` (all rows if None)."""
+        codes = self.codes if mask is None else self.codes[mask]
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.labels))
+        return sorted(self.labels[counts > 0])
+
+    def extended(self, values):
+        """A new index with rows for appended data added; unseen values get new codes."""
+        values = values.astype("string")
+        new = [v for v in pd.unique(values.dropna()) if v not in self._lookup]
+        labels = np.concatenate([self.labels, np.array(new, dtype=object)]) if new else self.labels
+        lookup = {label: i for i, label in enumerate(labels)}
+        codes = values.map(lookup).fillna(-1).to_numpy().astype(np.int32)
+
+        out = ColumnIndex.__new__(ColumnIndex)
+        out._set(labels, np.concatenate([self.codes, codes]))
+        return out
+
+
+class FilterIndex:
+    """Query API over a frame's filter columns; all masks are numpy bool arrays aligned to the frame's rows."""
+
+    def __init__(self, frame, columns=FILTER_COLUMNS):
+        self.columns = [c for c in columns if c in filter_columns(frame.iloc[:0], columns)]
+        self.n_rows = len(frame)
+        self._index = {c: ColumnIndex(s) for c, s in filter_columns(frame, self.columns).items()}
+
+    def narrow(self, mask, column, selected):
+        """AND-s `mask` (None = all rows) with the bitmap for `selected` values of `column`."""
+        rows = self._index[column].rows(selected, self.n_rows)
+        return rows if mask is None else mask & rows
+
+    def mask(self, selections):
+        """Bitmap for all non-empty selections combined, or None when nothing is selected."""
+        mask = None
+        for col, selected in selections.items():
+            if selected and col in self._index:
+                mask = self.narrow(mask, col, selected)
+        return mask
+
+    def column(self, column):
+        """The ColumnIndex for one column (labels, codes and row lookups)."""
+        return self._index[column]
+
+    def options(self, column, mask=None):
+        """Values of `column` available under `mask`."""
+        return self._index[column].present(mask)
+
+    def select(self, frame, selections):
+        """Rows of `frame` (the one this index was built over) matching `selections`."""
+        mask = self.mask(selections)
+        return frame if mask is None else frame[mask]
+
+    def extended(self, delta):
+        """A new index covering the frame plus appended rows (this one stays valid for readers)."""
+        out = FilterIndex.__new__(FilterIndex)
+        out.columns = self.columns
+        out.n_rows = self.n_rows + len(delta)
+        out._index = {c: self._index[c].extended(v) for c, v in filter_columns(delta, self.columns).items()}
+        return out
+
+
+# --- CACHE PER DATA VERSION ---
+_LOCK = threading.Lock()
+_INDEXES = {}  # (version, name) -> FilterIndex
+
+
+def get_filter_index(frame, version, name="rows"):
+    """
+    Returns the index over `frame` for this data version, building it on first use.
+    name="rows" is the master frame itself; other names (e.g. "cube") index frames
+    derived from it.
+    """
+    key = (version, name)
+    with _LOCK:
+        idx = _INDEXES.get(key)
+        if idx is None or idx.n_rows != len(frame):
+            idx = _INDEXES[key] = FilterIndex(frame)
+        return idx
+
+
+def _on_append(old_version, new_version, delta):
+    """Extends the master-frame index; indexes of derived frames are simply rebuilt on next use."""
+    with _LOCK:
+        idx = _INDEXES.get((old_version, "rows"))
+        _INDEXES.clear()
+        if idx is not None:
+            _INDEXES[(new_version, "rows")] = idx.extended(delta)
+
+
+register_append_hook(_on_append)
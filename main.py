@@ -1,18 +1,105 @@
+"""
+Keeps the Streamlit app awake.
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import TimeoutException
+By default this is a plain HTTP probe: the app is awake only if its Streamlit
+health endpoint answers "ok". Community Cloud renders its sleep page in the
+browser, so the page itself can't tell us. If the server answers but the app
+isn't healthy, the probe treats it as asleep. Only then (or with --browser)
+does it start headless Chrome to click "Yes, get this app back up", then poll
+the health endpoint until the app answers again. Loading the app in the browser also
+opens the first session, which starts the app's cache warm-up (warmup.py).
+
+    python main.py                              # HTTP probe, browser only if asleep
+    python main.py --browser                    # always open the app in Chrome
+    python main.py --url http://localhost:8501  # e.g. a local stand-in server
+    python main.py --probe-only                 # never start Chrome; exit 2 if asleep
+
+Exit code 0 means the app is up, 1 that it could not be reached or woken, and
+2 (only with --probe-only) that it is asleep, so a scheduled job can install
+Selenium just for that case.
+"""
+import argparse
 import os
+import sys
+import time
+import urllib.error
+import urllib.request
 
 # Streamlit app URL from environment variable (or default)
 STREAMLIT_URL = os.environ.get("STREAMLIT_APP_URL", "https://rozalia-dash.streamlit.app/")
+WAKE_BUTTON_TEXT = "Yes, get this app back up"
+HEALTH_PATHS = ["_stcore/health", "~/+/_stcore/health"]  # self-hosted, Community Cloud
+TIMEOUT = 15       # seconds per HTTP request
+ATTEMPTS = 4       # HTTP tries before giving up, with doubling pauses between them
+WAKE_WAIT = 180    # seconds to wait for the app to come back after clicking
+EXIT_ASLEEP = 2    # --probe-only exit code for a sleeping app
+
+
+def fetch(url, timeout=TIMEOUT):
+    """(status, body text) for a GET, or (None, error text) if the server couldn't be reached."""
+    request = urllib.request.Request(url, headers={"User-Agent": "rozalia-wake-probe"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.read().decode("utf-8", "replace")
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode("utf-8", "replace")
+    except (urllib.error.URLError, OSError) as e:
+        return None, str(e)
+
+
+def healthy(url, timeout=TIMEOUT):
+    """True if any Streamlit health endpoint under `url` answers "ok"."""
+    base = url if url.endswith("/") else url + "/"
+    for path in HEALTH_PATHS:
+        status, body = fetch(base + path, timeout)
+        if status == 200 and body.strip() == "ok":
+            return True
+    return False
+
+
+def probe(url, attempts=ATTEMPTS, timeout=TIMEOUT):
+    """
+    "awake", "asleep" or "down" for the app at `url`. Only the health endpoint
+    decides "awake"; otherwise the page's status picks between "asleep" (the
+    server answered, so wake it in the browser) and retrying network errors and
+    5xx responses, ending in "down".
+    """
+    delay = 2
+    for attempt in range(attempts):
+        if healthy(url, timeout):
+            return "awake"
+        status, body = fetch(url, timeout)
+        if status is not None and status < 500:
+            return "asleep"
+        print(f"Probe {attempt + 1}/{attempts}: {status or body}")
+        if attempt + 1 < attempts:
+            time.sleep(delay)
+            delay *= 2
+    return "down"
+
+
+def wait_until_awake(url, wait=WAKE_WAIT, timeout=TIMEOUT):
+    """Polls until the app's health endpoint answers; False after `wait` seconds."""
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if probe(url, attempts=1, timeout=timeout) == "awake":
+            return True
+        time.sleep(5)
+    return False
+
+
+def open_in_browser(url):
+    """Loads the app in headless Chrome, clicking the wake-up button if it is shown. True on success."""
+    # Only imported here: the HTTP probe must not need Selenium or Chrome
+    from selenium import webdriver
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+    from webdriver_manager.chrome import ChromeDriverManager
 
-def main():
     options = Options()
     options.add_argument('--headless=new')
     options.add_argument('--no-sandbox')
@@ -21,38 +108,68 @@ def main():
     options.add_argument('--window-size=1920,1080')
 
     driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-
+    button_xpath = f"//button[contains(text(),'{WAKE_BUTTON_TEXT}')]"
     try:
-        driver.get(STREAMLIT_URL)
-        print(f"Opened {STREAMLIT_URL}")
+        driver.get(url)
+        print(f"Opened {url}")
 
-        wait = WebDriverWait(driver, 15)
+        wait = WebDriverWait(driver, TIMEOUT)
         try:
-            # Look for the wake-up button
-            button = wait.until(
-                EC.element_to_be_clickable((By.XPATH, "//button[contains(text(),'Yes, get this app back up')]"))
-            )
+            button = wait.until(EC.element_to_be_clickable((By.XPATH, button_xpath)))
             print("Wake-up button found. Clicking...")
             button.click()
-
-            # After clicking, check if it disappears
             try:
-                wait.until(EC.invisibility_of_element_located((By.XPATH, "//button[contains(text(),'Yes, get this app back up')]")))
+                wait.until(EC.invisibility_of_element_located((By.XPATH, button_xpath)))
                 print("Button clicked and disappeared ✅ (app should be waking up)")
             except TimeoutException:
                 print("Button was clicked but did NOT disappear ❌ (possible failure)")
-                exit(1)
-
+                return False
         except TimeoutException:
-            # No button at all → app is assumed to be awake
-            print("No wake-up button found. Assuming app is already awake ✅")
+            print("No wake-up button found. App is already awake ✅")
+        # Stay on the page while the app boots so this browser's session triggers the warm-up
+        time.sleep(TIMEOUT)
+        return True
+    finally:
+        driver.quit()
+
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Wake the Streamlit app if it has gone to sleep.")
+    parser.add_argument("--url", default=STREAMLIT_URL)
+    parser.add_argument("--browser", action="store_true", help="always load the app in headless Chrome")
+    parser.add_argument("--wait", type=int, default=WAKE_WAIT, help="seconds to wait for the app after waking it")
+    parser.add_argument("--probe-only", action="store_true",
+                        help=f"only probe; exit {EXIT_ASLEEP} if the app is asleep instead of opening Chrome")
+    args = parser.parse_args(argv)
+    if args.browser and args.probe_only:
+        parser.error("--browser and --probe-only can't be combined")
+
+    state = "asleep" if args.browser else probe(args.url)
+    print(f"{args.url}: {state}")
+    if state == "awake":
+        print("App is awake ✅")
+        return 0
+    if state == "down":
+        print("App could not be reached ❌")
+        return 1
+    if args.probe_only:
+        print("App is asleep 💤")
+        return EXIT_ASLEEP
+
+    try:
+        if not open_in_browser(args.url):
+            return 1
     except Exception as e:
         print(f"Unexpected error: {e}")
-        exit(1)
-    finally:
-        driver.quit()
-        print("Script finished.")
+        return 1
+    if args.browser:
+        return 0
+    if wait_until_awake(args.url, args.wait):
+        print("App is back up ✅")
+        return 0
+    print(f"App still not up after {args.wait}s ❌")
+    return 1
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
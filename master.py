@@ -0,0 +1,44 @@
+# master.py
+"""
+The process-wide, pre-derived master frame every session reads.
+
+The snapshot's typed frame (State already normalized by schema.py) gets the
+Dashboard's Year/Month, the effort fields in kg/km/hours/people with their
+density metrics (units.py) and the archive-wide Outlier flags added once per
+data version. Sessions each get a shallow copy: with pandas copy-on-write
+(always on from pandas 3, which requirements.txt pins) that shares every
+column with the master instead of duplicating the archive, and a session
+that assigns to its copy only ever changes its own copy. A new data
+version swaps in a new frame in one step; sessions still holding the old one
+keep a consistent view until their next rerun.
+"""
+import threading
+
+from outliers import outlier_flags
+from perf import span
+from rollups import time_dims
+from units import EFFORT_COLUMNS, effort_columns
+
+DERIVED_COLUMNS = ["Year", "Month"] + EFFORT_COLUMNS  # added here; not part of the sheet's layout
+
+_LOCK = threading.Lock()
+_MASTER = (None, None)  # (version, derived frame)
+
+
+def derive(frame, version):
+    """`frame` plus Year/Month, the canonical effort columns and the Outlier flags for this data version."""
+    year, month = time_dims(frame["Date"])
+    flags = outlier_flags(frame, version)
+    return frame.assign(Year=year, Month=month, Outlier=flags.astype("category"), **effort_columns(frame))
+
+
+def get_master_frame(frame, version):
+    """A zero-copy view of the derived master frame for `version`, deriving it on first use."""
+    global _MASTER
+    with _LOCK:
+        current_version, master = _MASTER
+        if current_version != version or master is None or len(master) != len(frame):
+            with span("load: derive master frame"):
+                master = derive(frame, version)
+            _MASTER = (version, master)
+        return master.copy(deep=False)
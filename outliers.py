@@ -0,0 +1,214 @@
+# outliers.py
+"""
+Outlier detection for cleanup rows.
+
+A row is an outlier ("O") when any debris count is above its item's threshold,
+by default mean + 4 * std over the archive. Thresholds are computed once per
+data version as a vector and every row is checked with a single comparison.
+Mean/variance are kept as running moments so appended rows update them without
+rescanning the archive. Optionally thresholds can be computed per group
+(e.g. "Type of cleanup") or with a robust median/MAD rule.
+"""
+import copy
+import threading
+
+import numpy as np
+import pandas as pd
+
+from config import ALL_DEBRIS_ITEMS
+from snapshot import register_append_hook
+
+
+OUTLIER_MULTIPLIER = 4.0
+MIN_GROUP_SIZE = 5   # groups smaller than this use the archive-wide baseline
+MAD_SCALE = 1.4826   # makes the MAD comparable to a std for normal data
+_ALL = "__all__"
+
+
+class Moments:
+    """Per-group count / mean / sum of squared deviations for each item, mergeable across batches."""
+
+    def __init__(self, n, mean, m2):
+        self.n, self.mean, self.m2 = n, mean, m2
+
+    @classmethod
+    def from_values(cls, values, keys):
+        grp = values.groupby(keys, sort=False)
+        n = grp.size().astype(float)
+        return cls(n, grp.mean(), grp.var(ddof=0).fillna(0).mul(n, axis=0))
+
+    def merge(self, other):
+        """Combines two batches (Chan et al. parallel variance)."""
+        groups = self.n.index.union(other.n.index)
+        n_a, n_b = self.n.reindex(groups, fill_value=0), other.n.reindex(groups, fill_value=0)
+        mean_a = self.mean.reindex(groups).fillna(0)
+        mean_b = other.mean.reindex(groups).fillna(0)
+        n = n_a + n_b
+        delta = mean_b - mean_a
+        mean = mean_a + delta.mul(n_b / n, axis=0)
+        m2 = (self.m2.reindex(groups).fillna(0) + other.m2.reindex(groups).fillna(0)
+              + (delta ** 2).mul(n_a * n_b / n, axis=0))
+        return Moments(n, mean, m2)
+
+    def std(self):
+        # sample std (ddof=1), NaN for single-row groups, same as DataFrame.std()
+        return (self.m2.div(self.n - 1, axis=0)).where(self.n > 1) ** 0.5
+
+
+class OutlierDetector:
+    """
+    Holds per-item thresholds for the archive and flags rows against them.
+
+    method="std" uses mean + multiplier * std, method="mad" uses
+    median + multiplier * 1.4826 * MAD (falling back to std for items whose MAD
+    is 0, which is most of them for sparse counts). `group_by` names a column
+    whose values get their own baseline.
+    """
+
+    def __init__(self, items=None, multiplier=OUTLIER_MULTIPLIER, group_by=None, method="std"):
+        if method not in ("std", "mad"):
+            raise ValueError(f"Unknown outlier method: {method}")
+        self.items = list(items or ALL_DEBRIS_ITEMS)
+        self.multiplier = multiplier
+        self.group_by = group_by
+        self.method = method
+        self.n_rows = 0
+        self._moments = {}
+        self._robust = {}
+        self._thresholds = {}
+
+    def _values(self, df):
+        return df.reindex(columns=self.items).apply(pd.to_numeric, errors="coerce").fillna(0)
+
+    def _keys(self, df):
+        """Group key per row for each baseline we keep: archive-wide and (optionally) per group."""
+        keys = {_ALL: pd.Series(_ALL, index=df.index)}
+        if self.group_by:
+            keys[self.group_by] = df[self.group_by].astype("string").fillna("Unknown")
+        return keys
+
+    def fit(self, df):
+        values = self._values(df)
+        self._moments = {name: Moments.from_values(values, k) for name, k in self._keys(df).items()}
+        self._robust = {}
+        if self.method == "mad":
+            for name, k in self._keys(df).items():
+                med = values.groupby(k, sort=False).median()
+                dev = (values - med.reindex(k).to_numpy()).abs()
+                self._robust[name] = (med, dev.groupby(k, sort=False).median())
+        self.n_rows = len(df)
+        self._thresholds = {}
+        return self
+
+    def partial_fit(self, df):
+        """Folds newly appended rows into the running moments (std method only)."""
+        if self.method != "std":
+            raise ValueError("partial_fit is only supported for method='std'; call fit() instead")
+        if not self._moments:
+            return self.fit(df)
+        values = self._values(df)
+        for name, k in self._keys(df).items():
+            self._moments[name] = self._moments[name].merge(Moments.from_values(values, k))
+        self.n_rows += len(df)
+        self._thresholds = {}
+        return self
+
+    def copy(self):
+        """A detector with this one's fitted stats; partial_fit on the copy leaves this one untouched."""
+        other = copy.copy(self)
+        other._moments = dict(self._moments)
+        other._robust = dict(self._robust)
+        other._thresholds = {}
+        return other
+
+    def thresholds(self, name=_ALL):
+        """Threshold table for one baseline: one row per group, one column per item."""
+        if name not in self._thresholds:
+            m = self._moments[name]
+            thr = m.mean + self.multiplier * m.std()
+            if self.method == "mad":
+                med, mad = self._robust[name]
+                robust = med + self.multiplier * MAD_SCALE * mad
+                thr = robust.where(mad > 0, thr)
+            if name != _ALL:
+                thr.loc[m.n.reindex(thr.index) < MIN_GROUP_SIZE] = np.nan
+            self._thresholds[name] = thr[self.items]
+        return self._thresholds[name]
+
+    def flag(self, df):
+        """Returns a Series of "O" / "" aligned to df, one vectorized comparison for all rows and items."""
+        if df.empty or not self._moments:
+            return pd.Series("", index=df.index, dtype=object)
+
+        base = self.thresholds(_ALL).loc[_ALL].to_numpy()
+        thr = np.broadcast_to(base, (len(df), len(self.items)))
+        if self.group_by:
+            keys = df[self.group_by].astype("string").fillna("Unknown")
+            grouped = self.thresholds(self.group_by).reindex(keys).to_numpy()
+            # small or unseen groups fall back to the archive-wide threshold
+            thr = np.where(np.isnan(grouped), thr, grouped)
+
+        # NaN thresholds (single-row archive) never flag, as before
+        is_outlier = (self._values(df).to_numpy() > thr).any(axis=1)
+        return pd.Series(np.where(is_outlier, "O", ""), index=df.index, dtype=object)
+
+
+# --- CACHE PER DATA VERSION ---
+_LOCK = threading.Lock()
+_DETECTORS = {}  # (version, group_by, method, multiplier) -> OutlierDetector
+_FLAGS = {}      # same key -> flag Series for that version's frame
+
+
+def _evict(version):
+    """Drops detectors and flags cached for any other data version (called with _LOCK held)."""
+    for cache in (_DETECTORS, _FLAGS):
+        for key in [k for k in cache if k[0] != version]:
+            del cache[key]
+
+
+def get_detector(df, version, group_by=None, method="std", multiplier=OUTLIER_MULTIPLIER):
+    """Returns a fitted detector for this data version, fitting it only on first use."""
+    key = (version, group_by, method, multiplier)
+    with _LOCK:
+        det = _DETECTORS.get(key)
+        if det is None:
+            det = OutlierDetector(multiplier=multiplier, group_by=group_by, method=method).fit(df)
+            _evict(version)
+            _DETECTORS[key] = det
+        return det
+
+
+def cached_detector(version, group_by=None, method="std", multiplier=OUTLIER_MULTIPLIER):
+    """The detector already fitted for this data version, or None (never fits one)."""
+    with _LOCK:
+        return _DETECTORS.get((version, group_by, method, multiplier))
+
+
+def outlier_flags(df, version, group_by=None, method="std", multiplier=OUTLIER_MULTIPLIER):
+    """Outlier column for the whole frame of a data version, computed once and reused."""
+    key = (version, group_by, method, multiplier)
+    with _LOCK:
+        flags = _FLAGS.get(key)
+    if flags is None or len(flags) != len(df):
+        flags = get_detector(df, version, group_by, method, multiplier).flag(df)
+        with _LOCK:
+            _evict(version)
+            _FLAGS[key] = flags
+    return flags
+
+
+def _on_append(old_version, new_version, delta):
+    """
+    Rolls cached std detectors forward to the new version instead of refitting
+    them. Copies are updated, so readers of the old version keep consistent stats.
+    """
+    with _LOCK:
+        current = [(k, d) for k, d in _DETECTORS.items() if k[0] == old_version and d.method == "std"]
+    rolled = {(new_version,) + k[1:]: det.copy().partial_fit(delta) for k, det in current}
+    with _LOCK:
+        _evict(new_version)
+        for key, det in rolled.items():
+            _DETECTORS.setdefault(key, det)
+
+
+register_append_hook(_on_append)
@@ -0,0 +1,65 @@
+# paging.py
+"""
+Server-side paging for the History table.
+
+The archive is never copied or sent to the browser whole: a sort order (row
+positions) is computed once per data version and sort key, search/filter
+results narrow those positions, and only the requested page is sliced out,
+projected to the visible columns and formatted for display.
+"""
+import math
+import threading
+
+import numpy as np
+
+from config import DEBRIS_GROUPS, METADATA_FIELDS, SUMMARY_TOTALS
+
+PAGE_SIZES = [25, 50, 100, 250]
+SORT_KEYS = ["Date", "Submission Timestamp", "State", "City", "Location", "Total (All)"]
+BASE_COLUMNS = ["Date"] + [f for f in METADATA_FIELDS if f != "Date"]
+
+_LOCK = threading.Lock()
+_ORDERS = {}  # (version, sort_key, ascending) -> row positions
+
+
+def visible_columns(groups):
+    """Metadata, then the items of the selected DEBRIS_GROUPS, then the summary totals."""
+    items = [item for g in groups for item in DEBRIS_GROUPS[g]]
+    return BASE_COLUMNS + items + SUMMARY_TOTALS
+
+
+def sort_order(df, version, sort_key="Date", ascending=False):
+    """Row positions of `df` sorted by `sort_key` (blanks last), cached per data version."""
+    key = (version, sort_key, ascending)
+    with _LOCK:
+        order = _ORDERS.get(key)
+    if order is None or len(order) != len(df):
+        col = df[sort_key].reset_index(drop=True)
+        order = col.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+        with _LOCK:
+            for k in [k for k in _ORDERS if k[0] != version]:
+                del _ORDERS[k]
+            _ORDERS[key] = order
+    return order
+
+
+def apply_mask(order, mask):
+    """Keeps the positions in `order` whose row is selected by the bool array `mask` (None = all)."""
+    return order if mask is None else order[np.asarray(mask)[order]]
+
+
+def page_count(n_rows, page_size):
+    return max(1, math.ceil(n_rows / page_size))
+
+
+def page_frame(df, positions, page, page_size, columns):
+    """The rows for 1-based `page` of `positions`, projected to `columns` and formatted for display."""
+    start = (page - 1) * page_size
+    out = df.iloc[positions[start:start + page_size]].reindex(columns=columns)
+    out['Date'] = out['Date'].dt.strftime('%Y-%m-%d').fillna("Missing Date")
+    return out
+
+
+def export_csv(df, positions):
+    """CSV bytes for the selected rows in order; only called when an export is requested."""
+    return df.iloc[positions].to_csv(index=False).encode('utf-8-sig')
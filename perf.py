@@ -0,0 +1,124 @@
+# perf.py
+"""
+Lightweight timing for app reruns.
+
+Streamlit runs rozalia_app.py top to bottom on every widget change. The app
+marks each rerun with begin_run()/end_run(page) and wraps its stages in
+spans; a finished rerun is logged as one JSON line and kept in a bounded
+history, from which stage_stats() gives per-page percentiles for the admin
+panel. Spans outside a rerun (command line tools, the benchmark) cost one
+attribute lookup and record nothing.
+
+    with span("dashboard: rollup"):
+        g_df = queries.rollup(...)
+
+    @timed("load: backend read")
+    def read_rows(...): ...
+"""
+import cProfile
+import functools
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import pandas as pd
+
+HISTORY = 500          # reruns kept per (page, stage)
+PROFILE_LINES = 40     # functions shown from a cProfile capture
+
+# One JSON line per rerun on stderr; ROZALIA_PERF_LOG=0 turns it off
+logger = logging.getLogger("rozalia.perf")
+if os.environ.get("ROZALIA_PERF_LOG", "1") != "0" and not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+_LOCAL = threading.local()   # the rerun in progress on this script thread
+_LOCK = threading.Lock()
+_HISTORY = defaultdict(lambda: deque(maxlen=HISTORY))  # (page, stage) -> seconds
+
+
+def begin_run(profile=False):
+    """Starts timing a rerun (discarding one that never reached end_run, e.g. after st.rerun)."""
+    _LOCAL.run = {"started": time.perf_counter(), "spans": defaultdict(float), "profiler": None}
+    if profile:
+        _LOCAL.run["profiler"] = cProfile.Profile()
+        _LOCAL.run["profiler"].enable()
+
+
+@contextmanager
+def span(name):
+    """Adds the time spent in the block to stage `name` of the current rerun."""
+    run = getattr(_LOCAL, "run", None)
+    if run is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        run["spans"][name] += time.perf_counter() - start
+
+
+def timed(name):
+    """Decorator form of span()."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def end_run(page):
+    """
+    Finishes the current rerun: records its stages under `page`, logs it and
+    returns the cProfile report text if the run was profiled (else None).
+    """
+    run = getattr(_LOCAL, "run", None)
+    _LOCAL.run = None
+    if run is None:
+        return None
+    total = time.perf_counter() - run["started"]
+    stages = dict(run["spans"], total=total)
+    with _LOCK:
+        for stage, seconds in stages.items():
+            _HISTORY[(page, stage)].append(seconds)
+    logger.info(json.dumps({"event": "rerun", "page": page,
+                            "ms": {k: round(v * 1e3, 2) for k, v in stages.items()}}))
+
+    if run["profiler"] is None:
+        return None
+    run["profiler"].disable()
+    out = io.StringIO()
+    pstats.Stats(run["profiler"], stream=out).sort_stats("cumulative").print_stats(PROFILE_LINES)
+    return out.getvalue()
+
+
+def stage_stats():
+    """Per page and stage: reruns seen and p50/p90/p99/max in milliseconds."""
+    with _LOCK:
+        items = [(page, stage, list(times)) for (page, stage), times in _HISTORY.items()]
+    rows = []
+    for page, stage, times in items:
+        ms = pd.Series(times) * 1e3
+        rows.append({"Page": page, "Stage": stage, "Reruns": len(ms),
+                     "p50 ms": ms.quantile(0.5), "p90 ms": ms.quantile(0.9),
+                     "p99 ms": ms.quantile(0.99), "max ms": ms.max()})
+    if not rows:
+        return pd.DataFrame(columns=["Page", "Stage", "Reruns", "p50 ms", "p90 ms", "p99 ms", "max ms"])
+    return pd.DataFrame(rows).sort_values(["Page", "p50 ms"], ascending=[True, False], ignore_index=True).round(2)
+
+
+def reset():
+    with _LOCK:
+        _HISTORY.clear()
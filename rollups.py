@@ -0,0 +1,141 @@
+# rollups.py
+"""
+Pre-aggregated rollup cube for the Dashboard.
+
+Every cleanup is summed into one cell per distinct combination of the
+Dashboard's filter/group-by dimensions, with a column per debris item plus a
+cleanup count. Filters and group-bys then work on this much smaller table
+instead of scanning every row. The cube is built once per data version and
+new rows are folded in when the snapshot appends them.
+"""
+import threading
+
+import pandas as pd
+
+from config import ALL_DEBRIS_ITEMS, DEBRIS_GROUPS
+from schema import concat_frames
+from snapshot import register_append_hook
+from units import EFFORT_SUMS, effort_sums
+
+
+TYPE_LOC_COL = "Type of location (i.e. Sandy Beach, Marina, Open Water)"
+ORG_COL = "Name of Organization/Individual"
+CUBE_DIMS = ["Year", "Month", "State", "City", "Location", "Type of cleanup", TYPE_LOC_COL, ORG_COL]
+COUNT_COL = "Cleanups"
+MEASURES = ALL_DEBRIS_ITEMS + EFFORT_SUMS + [COUNT_COL]  # summed per cell
+
+
+def time_dims(dates):
+    """Year and Month labels ("Unknown" for missing dates) as categoricals."""
+    dates = pd.to_datetime(dates, errors='coerce')
+    year = dates.dt.year.astype("Int64").astype("string").fillna("Unknown").astype("category")
+    month = dates.dt.month_name().fillna("Unknown").astype("category")
+    return year, month
+
+
+def add_time_dims(df):
+    """Adds the Dashboard's derived Year and Month columns (a no-op on the derived master frame)."""
+    if "Year" in df.columns and "Month" in df.columns:
+        return df
+    df = df.copy()
+    df['Year'], df['Month'] = time_dims(df['Date'])
+    return df
+
+
+def _aggregate(frame):
+    # grouping on categorical codes; blank (NA) values are kept as their own cell
+    cells = frame.groupby(CUBE_DIMS, sort=False, dropna=False, observed=True)[MEASURES].sum()
+    return cells.reset_index()
+
+
+def build_cube(df):
+    """Rolls raw cleanup rows up into cube cells."""
+    frame = add_time_dims(df) if "Year" not in df.columns else df
+    frame = frame.reindex(columns=CUBE_DIMS + ALL_DEBRIS_ITEMS)
+    for col in CUBE_DIMS:
+        if not isinstance(frame[col].dtype, pd.CategoricalDtype):
+            frame[col] = frame[col].astype("category")
+    frame[ALL_DEBRIS_ITEMS] = frame[ALL_DEBRIS_ITEMS].fillna(0)
+    frame[EFFORT_SUMS] = effort_sums(df)
+    frame[COUNT_COL] = 1
+    return _aggregate(frame)
+
+
+class RollupCube:
+    """The cube for one data version; `frame` has one row per dimension combination."""
+
+    def __init__(self, frame):
+        self.frame = frame
+
+    @classmethod
+    def from_rows(cls, df):
+        return cls(build_cube(df))
+
+    def append(self, delta):
+        """Returns a new cube with appended raw rows folded in; only the delta and the (small) cube are touched."""
+        return RollupCube(_aggregate(concat_frames([self.frame, build_cube(delta)])))
+
+    @staticmethod
+    def rollup(cells, by):
+        """
+        Sums cube cells (usually already filtered) by the given dimensions and adds
+        the Dashboard's ' | '-joined X_Axis label.
+        """
+        measures = [m for m in MEASURES if m in cells.columns]
+        grouped = cells.groupby(by, sort=True, dropna=False, observed=True)[measures].sum()
+        grouped = grouped.reset_index()
+        labels = [grouped[col].astype("string").fillna("Unknown") for col in by]
+        x_axis = labels[0]
+        for label in labels[1:]:
+            x_axis = x_axis + " | " + label
+        grouped.insert(0, "X_Axis", x_axis)
+        return grouped
+
+
+def material_totals(grouped):
+    """Long (X_Axis, Count, Material) frame of each group's pieces per DEBRIS_GROUPS material, for the stacked bar."""
+    parts = []
+    for cat, items in DEBRIS_GROUPS.items():
+        valid_items = [i for i in items if i in grouped.columns]
+        if valid_items:
+            part = pd.DataFrame({'X_Axis': grouped['X_Axis'], 'Count': grouped[valid_items].sum(axis=1)})
+            part['Material'] = cat
+            parts.append(part)
+    return pd.concat(parts)
+
+
+def subcategory_counts(grouped, category):
+    """Long (X_Axis, Item, Count) frame of the category's items that have any pieces, for the breakdown charts."""
+    items = [i for i in DEBRIS_GROUPS[category] if i in grouped.columns]
+    item_counts = grouped[items].sum()
+    active_items = item_counts[item_counts > 0].index.tolist()
+    if not active_items:
+        return pd.DataFrame(columns=['X_Axis', 'Item', 'Count'])
+    long = grouped.melt(id_vars=['X_Axis'], value_vars=active_items, var_name='Item', value_name='Count')
+    return long.sort_values(['X_Axis', 'Item'], ignore_index=True)
+
+
+# --- CACHE PER DATA VERSION ---
+_LOCK = threading.Lock()
+_CUBES = {}  # version -> RollupCube
+
+
+def get_cube(df, version):
+    """Returns the cube for this data version, building it only on first use."""
+    with _LOCK:
+        cube = _CUBES.get(version)
+        if cube is None:
+            cube = _CUBES[version] = RollupCube.from_rows(df)
+        return cube
+
+
+def _on_append(old_version, new_version, delta):
+    """Carries the current cube forward to the new version instead of rebuilding it."""
+    with _LOCK:
+        cube = _CUBES.pop(old_version, None)
+        _CUBES.clear()
+        if cube is not None:
+            _CUBES[new_version] = cube.append(delta)
+
+
+register_append_hook(_on_append)
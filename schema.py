@@ -0,0 +1,124 @@
+# schema.py
+"""
+Column types for the in-memory master frame, derived from config.py.
+
+Repeated labels (State, City, Location, cleanup type, organization, ...) are
+stored as categoricals, free text as pandas strings, debris counts and totals
+as the smallest unsigned int that fits, and blanks as real NA rather than the
+"None" string the sheet uses. Run `python schema.py` to see the memory
+footprint of the local snapshot compared to the old all-str/float64 layout.
+"""
+import sys
+
+import pandas as pd
+
+from config import ALL_DEBRIS_ITEMS, METADATA_FIELDS, SUMMARY_TOTALS
+
+
+CATEGORICAL_FIELDS = [
+    "Location",
+    "Name of Organization/Individual",
+    "City",
+    "State",
+    "Country",
+    "Type of cleanup",
+    "Type of location (i.e. Sandy Beach, Marina, Open Water)",
+    "Units (Distance cleaned)",
+    "Start time",
+    "Units (Total weight)",
+]
+DATE_FIELDS = ["Date"]
+TEXT_FIELDS = [f for f in METADATA_FIELDS if f not in CATEGORICAL_FIELDS + DATE_FIELDS]
+COUNT_FIELDS = ALL_DEBRIS_ITEMS + [t for t in SUMMARY_TOTALS if t != "Outlier"]
+COLUMN_ORDER = ["Date"] + [f for f in METADATA_FIELDS if f != "Date"] + ALL_DEBRIS_ITEMS + SUMMARY_TOTALS
+
+# What the sheet and older exports use for "blank"
+NA_SENTINELS = ["", "None", "none", "nan", "NaN"]
+
+
+def _text(s):
+    s = s.astype("string").str.strip()
+    return s.mask(s.isin(NA_SENTINELS))
+
+
+def _count(s):
+    s = pd.to_numeric(s, errors="coerce").fillna(0)
+    return pd.to_numeric(s, downcast="unsigned")
+
+
+def apply_schema(df):
+    """
+    Returns `df` with every master column present, typed and in order.
+    Unknown columns (e.g. old Year/Month/Day helpers) are dropped.
+    """
+    df = df.reindex(columns=COLUMN_ORDER)
+    out = {}
+    for col in COLUMN_ORDER:
+        s = df[col]
+        if col in DATE_FIELDS:
+            out[col] = pd.to_datetime(s, errors="coerce")
+        elif col in CATEGORICAL_FIELDS:
+            s = _text(s)
+            if col == "State":
+                s = s.str.upper()
+            out[col] = s.astype("category")
+        elif col in COUNT_FIELDS:
+            out[col] = _count(s)
+        else:
+            out[col] = _text(s)
+    return pd.DataFrame(out, index=df.index)
+
+
+def concat_frames(frames):
+    """Concatenates typed frames without categoricals falling back to object."""
+    frames = [f for f in frames if f is not None]
+    cat_cols = [c for c in frames[0].columns if isinstance(frames[0][c].dtype, pd.CategoricalDtype)]
+    frames = [f.copy() for f in frames]
+    for col in cat_cols:
+        cats = pd.Index([])
+        for f in frames:
+            cats = cats.union(f[col].astype("category").cat.categories)
+        for f in frames:
+            f[col] = f[col].astype(pd.CategoricalDtype(cats))
+    return pd.concat(frames, ignore_index=True)
+
+
+def legacy_layout(df):
+    """The frame as load_and_sync_data() used to build it: "None" strings and float64 counts."""
+    out = df.copy()
+    for col in METADATA_FIELDS:
+        if col not in DATE_FIELDS:
+            out[col] = out[col].astype(object).where(out[col].notna(), "None").astype(str).astype(object)
+    for col in COUNT_FIELDS:
+        out[col] = out[col].astype("float64")
+    return out
+
+
+def memory_report(df, per_rows=10_000):
+    """Deep memory use per column, in total and scaled to `per_rows` rows."""
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({"dtype": df.dtypes.astype(str), "bytes": usage})
+    scale = per_rows / max(len(df), 1)
+    report[f"bytes per {per_rows:,} rows"] = (report["bytes"] * scale).round().astype("int64")
+    report.loc["TOTAL"] = ["", report["bytes"].sum(), report[f"bytes per {per_rows:,} rows"].sum()]
+    return report
+
+
+def main(argv=None):
+    from snapshot import CACHE_DIR, SNAPSHOT_FILE
+
+    argv = sys.argv[1:] if argv is None else argv
+    path = argv[0] if argv else f"{CACHE_DIR}/{SNAPSHOT_FILE}"
+    df = apply_schema(pd.read_parquet(path))
+
+    typed = memory_report(df).loc["TOTAL"]
+    legacy = memory_report(legacy_layout(df)).loc["TOTAL"]
+    col = "bytes per 10,000 rows"
+    print(f"{len(df):,} rows")
+    print(f"typed schema : {typed[col] / 1e6:8.2f} MB per 10k rows")
+    print(f"legacy layout: {legacy[col] / 1e6:8.2f} MB per 10k rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
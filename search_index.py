@@ -0,0 +1,141 @@
+# search_index.py
+"""
+Trigram search over Location, City and Organization.
+
+Free-text site names repeat across many rows, so the index is built over the
+distinct values only (taken from the filter index) and matching values are
+turned into rows through the filter index's posting lists. Every value is
+normalized (case, punctuation, spacing) and split into padded trigrams, which
+supports:
+
+    "contains" - the query appears anywhere in the value (old History search)
+    "prefix"   - a word in the value starts with the query
+    "fuzzy"    - trigram similarity, for spelling variants ("Ft Adams" ~ "Fort Adams")
+
+Fuzzy matching works on sites.site_key (abbreviations such as ft/pt/bch
+expanded) and scores a value by the share of the query's trigrams it holds.
+Numbers must match exactly, so "town 3" finds "Town 3" but not "Town 31".
+"""
+import re
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+from filter_index import ORG_COL, get_filter_index
+from sites import site_key
+
+SEARCH_COLUMNS = ["Location", "City", ORG_COL]
+SEARCH_MODES = ["contains", "prefix", "fuzzy"]
+FUZZY_THRESHOLD = 0.7  # minimum share of the query's trigrams a value must hold for a fuzzy hit
+
+
+def normalize(text):
+    return re.sub(r"\s+", " ", re.sub(r"[^\w]+", " ", str(text).casefold())).strip()
+
+
+def trigrams(text, padded=True):
+    if padded:
+        text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def numbers(text):
+    return set(re.findall(r"\d+", text))
+
+
+class SearchIndex:
+    """Trigram postings over the distinct values of SEARCH_COLUMNS of one FilterIndex."""
+
+    def __init__(self, filter_index, columns=SEARCH_COLUMNS):
+        self.filter_index = filter_index
+        self.entries = []  # (column, label)
+        self.texts = []    # normalized label
+        self.keys = []     # sites.site_key of the label, for fuzzy matching
+        postings, key_postings = defaultdict(list), defaultdict(list)
+        for col in columns:
+            if col not in filter_index.columns:
+                continue
+            for label in filter_index.column(col).labels:
+                entry_id = len(self.entries)
+                self.entries.append((col, label))
+                self.texts.append(normalize(label))
+                self.keys.append(site_key(label))
+                for gram in trigrams(self.texts[-1]):
+                    postings[gram].append(entry_id)
+                for gram in trigrams(self.keys[-1]):
+                    key_postings[gram].append(entry_id)
+        self.key_sizes = np.array([len(trigrams(k)) for k in self.keys], dtype=np.int32)
+        self.postings = {g: np.array(ids, dtype=np.int32) for g, ids in postings.items()}
+        self.key_postings = {g: np.array(ids, dtype=np.int32) for g, ids in key_postings.items()}
+
+    def _candidates(self, query):
+        """Entries containing every inner trigram of the query (all entries for very short queries)."""
+        grams = trigrams(query, padded=False)
+        if not grams:
+            return range(len(self.entries))
+        lists = sorted((self.postings.get(g, np.empty(0, np.int32)) for g in grams), key=len)
+        ids = lists[0]
+        for other in lists[1:]:
+            ids = np.intersect1d(ids, other, assume_unique=True)
+        return ids
+
+    def match_ids(self, query, mode="contains"):
+        """Ids of matching entries, best matches first for fuzzy mode."""
+        q = normalize(query)
+        if not q:
+            return []
+        if mode == "contains":
+            return [i for i in self._candidates(q) if q in self.texts[i]]
+        if mode == "prefix":
+            return [i for i in self._candidates(q)
+                    if self.texts[i].startswith(q) or f" {q}" in self.texts[i]]
+        if mode == "fuzzy":
+            key = site_key(query)
+            q_grams = [g for g in trigrams(key) if g in self.key_postings]
+            if not q_grams:
+                return []
+            hits = np.bincount(np.concatenate([self.key_postings[g] for g in q_grams]), minlength=len(self.entries))
+            score = hits / len(trigrams(key))
+            exact = {int(i) for i in self._candidates(q) if q in self.texts[i]}
+            wanted = numbers(key)
+            # best coverage first, shorter (closer) values first among equals
+            ranked = np.lexsort((self.key_sizes, -score))
+            return [int(i) for i in ranked
+                    if (score[i] >= FUZZY_THRESHOLD or i in exact) and wanted <= numbers(self.keys[i])]
+        raise ValueError(f"Unknown search mode: {mode}")
+
+    def matches(self, query, mode="contains"):
+        """{column: [matching values]}."""
+        out = defaultdict(list)
+        for i in self.match_ids(query, mode):
+            col, label = self.entries[i]
+            out[col].append(label)
+        return dict(out)
+
+    def mask(self, query, mode="contains"):
+        """Row bitmap (aligned to the indexed frame) of rows matching in any search column, None for an empty query."""
+        if not normalize(query):
+            return None
+        mask = np.zeros(self.filter_index.n_rows, dtype=bool)
+        for col, labels in self.matches(query, mode).items():
+            mask |= self.filter_index.column(col).rows(labels, self.filter_index.n_rows)
+        return mask
+
+
+# --- CACHE PER DATA VERSION ---
+_LOCK = threading.Lock()
+_INDEXES = {}  # (version, name) -> SearchIndex
+
+
+def get_search_index(frame, version, name="rows"):
+    """Search index over the same frame/name as filter_index.get_filter_index, refreshed per data version."""
+    f_index = get_filter_index(frame, version, name)
+    key = (version, name)
+    with _LOCK:
+        idx = _INDEXES.get(key)
+        if idx is None or idx.filter_index is not f_index:
+            for k in [k for k in _INDEXES if k[0] != version]:
+                del _INDEXES[k]
+            idx = _INDEXES[key] = SearchIndex(f_index)
+        return idx
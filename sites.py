@@ -0,0 +1,314 @@
+# sites.py
+"""
+Canonical dictionary for Location, City and Organization names.
+
+The same beach is typed many ways ("Ft. Adams", "fort adams ", "Fort Adams
+State Park" after someone adds an alias). Every name is reduced to a match key
+(case, punctuation, spacing and common abbreviations folded), looked up in the
+field's alias table and known names, and, failing that, matched by trigram
+similarity against the known names (never across different numbers, so
+"Beach 1" and "Beach 11" stay apart). Anything still new becomes a canonical
+name with the next integer ID. IDs are never reused: merging two names
+redirects the newer ID to the older one.
+
+The snapshot canonicalizes rows as it normalizes them, so every derived frame,
+filter, cube cell and search sees canonical names, and stores the IDs next to
+each row ("Location ID", "City ID", "Organization ID").
+
+The curated dictionary is site_dictionary.json next to this file, committed
+with the code; the commands below edit it. At runtime the app starts from it
+and saves names it meets for the first time to CACHE_DIR (ROZALIA_SITE_DICT),
+which a redeploy wipes. So IDs of committed names are stable for good, while
+IDs of names added at runtime only last as long as the deployment: run
+recanonicalize and commit the file to make them permanent.
+
+    python sites.py recanonicalize                # add every name in the sheet
+    python sites.py alias Location "Ft Adams SP" "Fort Adams"
+    python sites.py recanonicalize --source export.csv --dry-run
+    python sites.py show City
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+from collections import Counter, defaultdict
+
+import numpy as np
+import pandas as pd
+
+SEED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "site_dictionary.json")
+DICTIONARY_PATH = os.environ.get(
+    "ROZALIA_SITE_DICT", os.path.join(os.environ.get("ROZALIA_CACHE_DIR", ".cache"), "site_dictionary.json")
+)
+FIELDS = {
+    "Location": "Location ID",
+    "City": "City ID",
+    "Name of Organization/Individual": "Organization ID",
+}
+ID_COLUMNS = list(FIELDS.values())
+FUZZY_MERGE = 0.8  # trigram Jaccard similarity at which two spellings are the same name
+
+ABBREVIATIONS = {
+    "ft": "fort", "pt": "point", "mt": "mount", "bch": "beach", "hbr": "harbor", "harbour": "harbor",
+    "isl": "island", "pk": "park", "sp": "state park", "&": "and",
+}
+
+
+def site_key(name):
+    """Match key: casefolded words with punctuation dropped and abbreviations expanded."""
+    words = re.sub(r"[^\w&]+", " ", str(name).casefold()).split()
+    return " ".join(ABBREVIATIONS.get(w, w) for w in words)
+
+
+def display_name(name):
+    """How a new canonical name is shown: the first spelling seen, with whitespace tidied."""
+    return re.sub(r"\s+", " ", str(name)).strip()
+
+
+def _grams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _numbers(key):
+    return tuple(re.findall(r"\d+", key))
+
+
+class FieldDictionary:
+    """Names, aliases and merges for one field. ID = position in `names`."""
+
+    def __init__(self, names=(), aliases=None, merged=None):
+        self.names = []
+        self.aliases = dict(aliases or {})                       # match key -> id
+        self.merged = {int(k): int(v) for k, v in (merged or {}).items()}  # old id -> surviving id
+        self._keys = {}                                          # match key -> id
+        self._postings = defaultdict(set)                        # trigram -> ids
+        self._sizes = []
+        for name in names:
+            self._add(name)
+
+    def _add(self, name):
+        new_id = len(self.names)
+        key = site_key(name)
+        self.names.append(name)
+        grams = _grams(key)
+        self._sizes.append(len(grams))
+        self._keys.setdefault(key, new_id)
+        for g in grams:
+            self._postings[g].add(new_id)
+        return new_id
+
+    def resolve(self, name_id):
+        """Follows merges to the surviving ID."""
+        while name_id in self.merged:
+            name_id = self.merged[name_id]
+        return name_id
+
+    def similar(self, key, threshold=FUZZY_MERGE, exclude=None):
+        """Surviving ID of the most similar known name (same numbers, Jaccard >= threshold), or None."""
+        grams = _grams(key)
+        hits = Counter(i for g in grams for i in self._postings.get(g, ()))
+        best, best_score = None, threshold
+        numbers = _numbers(key)
+        # shared trigram counts don't order candidates by Jaccard, so every candidate is scored;
+        # ties go to the older name
+        for i, shared in hits.items():
+            score = shared / (len(grams) + self._sizes[i] - shared)
+            if score < best_score or (score == best_score and best is not None and i > best):
+                continue
+            if i != exclude and self.resolve(i) != exclude and _numbers(site_key(self.names[i])) == numbers:
+                best, best_score = i, score
+        return None if best is None else self.resolve(best)
+
+    def lookup(self, name, threshold=FUZZY_MERGE):
+        """ID for `name`, adding it as a new canonical name if nothing matches. Returns (id, added)."""
+        key = site_key(name)
+        if not key:
+            return None, False
+        for table in (self.aliases, self._keys):
+            if key in table:
+                return self.resolve(table[key]), False
+        match = self.similar(key, threshold)
+        if match is not None:
+            self._keys[key] = match
+            return match, False
+        return self._add(display_name(name)), True
+
+    def merge(self, old_id, new_id):
+        self.merged[old_id] = self.resolve(new_id)
+
+    def to_json(self):
+        return {"names": self.names, "aliases": self.aliases, "merged": {str(k): v for k, v in self.merged.items()}}
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class SiteDictionary:
+    """
+    All FIELDS' dictionaries plus a revision that changes whenever existing rows
+    would map differently. Loaded from `path`, or from `seed` when `path` is
+    missing or older than the seed's revision; saved to `path`.
+    """
+
+    def __init__(self, path=DICTIONARY_PATH, seed=SEED_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.dirty = False
+        data = _read_json(path)
+        seed_data = _read_json(seed) if seed and seed != path else {}
+        if not data or seed_data.get("revision", 0) > data.get("revision", 0):
+            data = seed_data
+        self.revision = data.get("revision", 0)
+        stored = data.get("fields", {})
+        self.fields = {f: FieldDictionary(**stored.get(f, {})) for f in FIELDS}
+
+    def ids(self, field, values, threshold=FUZZY_MERGE):
+        """Canonical IDs (nullable UInt32) for a Series of names; each distinct name is matched once."""
+        values = values.astype("category") if not isinstance(values.dtype, pd.CategoricalDtype) else values
+        codes = values.cat.codes.to_numpy()
+        by_code = np.full(len(values.cat.categories) + 1, -1, dtype=np.int64)  # NA codes (-1) land on the last slot
+        with self._lock:
+            for code in pd.unique(codes[codes >= 0]):  # in order of first appearance, so new names keep the first spelling
+                name_id, added = self.fields[field].lookup(values.cat.categories[code], threshold)
+                by_code[code] = -1 if name_id is None else name_id
+                self.dirty |= added
+        row_ids = by_code[codes]
+        return pd.arrays.IntegerArray(np.where(row_ids < 0, 0, row_ids).astype(np.uint32), row_ids < 0)
+
+    def names(self, field, ids):
+        """Canonical names for an ID array (NA stays NA) as a categorical."""
+        table = np.array(self.fields[field].names + [None], dtype=object)
+        idx = np.asarray(pd.array(ids, dtype="UInt32").fillna(len(table) - 1), dtype=np.int64)
+        return pd.Categorical(table[idx])
+
+    def save(self, bump_revision=False):
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            if bump_revision:
+                self.revision += 1
+            data = {"revision": self.revision, "fields": {f: d.to_json() for f, d in self.fields.items()}}
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(data, f, indent=1, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            self.dirty = False
+
+
+def canonicalize_frame(df, dictionary=None):
+    """Replaces FIELDS with their canonical names and adds the ID columns (in place on `df`, which is returned)."""
+    dictionary = dictionary or get_dictionary()
+    for field, id_col in FIELDS.items():
+        if field not in df.columns:
+            continue
+        ids = dictionary.ids(field, df[field])
+        df[field] = pd.Series(dictionary.names(field, ids), index=df.index).astype("category")
+        df[id_col] = pd.Series(ids, index=df.index)
+    if dictionary.dirty:
+        dictionary.save()
+    return df
+
+
+_DICTIONARY = None
+_DICTIONARY_LOCK = threading.Lock()
+
+
+def get_dictionary():
+    """The shared SiteDictionary, loaded from DICTIONARY_PATH on first use."""
+    global _DICTIONARY
+    with _DICTIONARY_LOCK:
+        if _DICTIONARY is None:
+            _DICTIONARY = SiteDictionary()
+        return _DICTIONARY
+
+
+# --- MAINTENANCE ---
+def recanonicalize(dictionary, raw, threshold=FUZZY_MERGE):
+    """
+    Re-matches every distinct raw name against the current aliases and names,
+    then merges known names that are now similar enough (newer ID into older).
+    Returns {field: [(merged name, surviving name), ...]}.
+    """
+    merges = {}
+    for field in FIELDS:
+        d = dictionary.fields[field]
+        if field in raw.columns:
+            for name in pd.unique(raw[field].dropna().astype(str)):
+                d.lookup(name, threshold)
+        merges[field] = []
+        for i, name in enumerate(d.names):
+            if i in d.merged:
+                continue
+            key = site_key(name)
+            target = d.aliases.get(key)
+            target = d.resolve(target) if target is not None else d.similar(key, threshold, exclude=i)
+            if target is not None and target != i and target < i:
+                d.merge(i, target)
+                merges[field].append((name, d.names[target]))
+    return merges
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the canonical Location/City/Organization dictionary.")
+    parser.add_argument("--dictionary", default=SEED_PATH, help="dictionary file to edit (default: the committed one)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    show = sub.add_parser("show", help="list canonical names, IDs and aliases for a field")
+    show.add_argument("field", choices=list(FIELDS))
+    alias = sub.add_parser("alias", help="map a spelling onto a canonical name")
+    alias.add_argument("field", choices=list(FIELDS))
+    alias.add_argument("variant")
+    alias.add_argument("canonical")
+    recan = sub.add_parser("recanonicalize", help="re-match the whole archive and merge near-duplicate names")
+    recan.add_argument("--source", help="CSV/Parquet export of the sheet (default: read the sheet)")
+    recan.add_argument("--threshold", type=float, default=FUZZY_MERGE)
+    recan.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    dictionary = SiteDictionary(args.dictionary, seed=None)
+    if args.command == "show":
+        d = dictionary.fields[args.field]
+        aliases = defaultdict(list)
+        for key, i in d.aliases.items():
+            aliases[d.resolve(i)].append(key)
+        for i, name in enumerate(d.names):
+            if i not in d.merged:
+                extra = f"  (aliases: {', '.join(aliases[i])})" if aliases[i] else ""
+                print(f"{i:6d}  {name}{extra}")
+        return 0
+
+    if args.command == "alias":
+        d = dictionary.fields[args.field]
+        target, _ = d.lookup(args.canonical)
+        d.aliases[site_key(args.variant)] = target
+        dictionary.save(bump_revision=True)
+        print(f"{args.variant!r} -> {d.names[target]!r} (ID {target})")
+        return 0
+
+    if args.source:
+        raw = pd.read_parquet(args.source) if args.source.endswith(".parquet") else pd.read_csv(args.source, dtype=str)
+    else:
+        from storage import _values_to_frame, open_worksheet_from_secrets
+
+        values = open_worksheet_from_secrets().get_all_values()
+        raw = _values_to_frame(values[0], values[1:]) if values else pd.DataFrame()
+    merges = recanonicalize(dictionary, raw, args.threshold)
+    for field, pairs in merges.items():
+        live = sum(1 for i in range(len(dictionary.fields[field].names)) if i not in dictionary.fields[field].merged)
+        print(f"{field}: {live:,} canonical names, {len(pairs):,} merged")
+        for old, new in pairs:
+            print(f"    {old!r} -> {new!r}")
+    if not args.dry_run:
+        dictionary.save(bump_revision=True)
+        print(f"Saved {args.dictionary}; snapshots rebuild on the next sync.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
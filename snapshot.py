@@ -0,0 +1,212 @@
+# snapshot.py
+"""
+Local snapshot of the normalized master log.
+
+The already-cleaned frame is kept on disk as Parquet next to a small JSON file
+describing how far into the sheet it goes. A sync only asks the backend for the
+rows below that point, normalizes just those and appends them, so a warm start
+is a single Parquet read and only new submissions cross the wire.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+from perf import span
+from schema import COLUMN_ORDER, apply_schema, concat_frames
+from sites import canonicalize_frame, get_dictionary
+
+CACHE_DIR = os.environ.get("ROZALIA_CACHE_DIR", ".cache")
+SNAPSHOT_FILE = "master_log.parquet"
+META_FILE = "master_log.json"
+SCHEMA_VERSION = 3  # bump when normalize_frame's output changes so old snapshots are discarded
+
+SYNC_INTERVAL = 60                  # seconds between checks for new rows (old ttl="1m")
+FULL_REFRESH_INTERVAL = 6 * 60 * 60  # re-pull everything now and then to pick up hand edits in the sheet
+
+# Callbacks run as fn(old_version, new_version, delta) whenever rows are appended by a
+# delta sync, so derived caches can update themselves instead of rebuilding
+_APPEND_HOOKS = []
+
+# Raw columns that identify the last synced row, used to check the sheet wasn't rewritten under us
+ANCHOR_FIELDS = ["Submission Timestamp", "Date", "Location", "Email"]
+
+
+def register_append_hook(fn):
+    """Registers `fn(old_version, new_version, delta)` to be called after each delta sync."""
+    if fn not in _APPEND_HOOKS:
+        _APPEND_HOOKS.append(fn)
+    return fn
+
+
+def empty_frame():
+    return normalize_frame(pd.DataFrame(columns=COLUMN_ORDER))
+
+
+def normalize_frame(df):
+    """
+    Drops blank rows, ensures all columns exist and are typed per schema.py, and
+    canonicalizes Location/City/Organization with their IDs alongside (sites.py).
+    """
+    return canonicalize_frame(apply_schema(df.dropna(how="all")).reset_index(drop=True))
+
+
+def _anchor(raw):
+    """Identity of the last raw sheet row, or None for an empty read."""
+    if raw.empty:
+        return None
+    last = raw.iloc[-1]
+    return "|".join(str(last.get(f, "")) for f in ANCHOR_FIELDS)
+
+
+def _fingerprint(df):
+    return hashlib.sha1(pd.util.hash_pandas_object(df, index=False).values.tobytes()).hexdigest()[:16]
+
+
+class Snapshot:
+    """
+    Process-wide holder of the normalized master frame.
+
+    `fetch_rows(start_row)` must return the raw sheet rows from `start_row`
+    (1-based, row 1 is the header) to the bottom; storage.read_rows does this
+    for Google Sheets.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.frame = None
+        self.meta = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def version(self):
+        """Data-version token; changes whenever the frame contents change."""
+        return self.meta.get("version", "empty")
+
+    def _path(self, name):
+        return os.path.join(self.cache_dir, name)
+
+    def _load(self):
+        try:
+            with open(self._path(META_FILE)) as f:
+                meta = json.load(f)
+            if meta.get("schema") != SCHEMA_VERSION or meta.get("sites") != get_dictionary().revision:
+                return
+            frame = pd.read_parquet(self._path(SNAPSHOT_FILE))
+        except (OSError, ValueError):
+            return
+        self.frame, self.meta = frame, meta
+
+    def _save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # write to temp files first so a crash never leaves a half-written snapshot
+        tmp_frame, tmp_meta = self._path(SNAPSHOT_FILE + ".tmp"), self._path(META_FILE + ".tmp")
+        self.frame.to_parquet(tmp_frame, index=False)
+        with open(tmp_meta, "w") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_frame, self._path(SNAPSHOT_FILE))
+        os.replace(tmp_meta, self._path(META_FILE))
+
+    def mark_stale(self):
+        """Forces the next sync() to check the backend (e.g. right after a submission)."""
+        with self._lock:
+            self.meta["synced_at"] = 0
+
+    def _full_sync(self, fetch_rows):
+        """
+        Re-reads the whole sheet. If the contents come back unchanged the frame
+        and version are kept, so the delta-chained version (and every cache
+        keyed on it) survives the periodic refresh.
+        """
+        with span("load: backend read"):
+            raw = fetch_rows(2)
+        with span("load: normalize"):
+            frame = normalize_frame(raw) if not raw.empty else empty_frame()
+        version = _fingerprint(frame)
+        old_version = self.meta.get("version")
+        if (old_version and self.frame is not None and len(self.frame) == len(frame)
+                and _fingerprint(self.frame) == version):
+            version = old_version
+        else:
+            self.frame = frame
+        now = time.time()
+        self.meta = {
+            "schema": SCHEMA_VERSION,
+            "sites": get_dictionary().revision,
+            "sheet_rows": len(raw),
+            "anchor": _anchor(raw),
+            "version": version,
+            "synced_at": now,
+            "full_synced_at": now,
+        }
+
+    def _delta_sync(self, fetch_rows):
+        """Fetches rows from the last known one down. Returns False if a full sync is needed."""
+        sheet_rows = self.meta.get("sheet_rows", 0)
+        if not sheet_rows or self.frame is None:
+            return False
+
+        # Re-read the last row we already have to confirm the sheet wasn't edited above it
+        with span("load: backend read"):
+            raw = fetch_rows(sheet_rows + 1)
+        if _anchor(raw.iloc[:1]) != self.meta.get("anchor"):
+            return False
+
+        new_raw = raw.iloc[1:]
+        if not new_raw.empty:
+            with span("load: normalize"):
+                delta = normalize_frame(new_raw)
+            self.frame = concat_frames([self.frame, delta])
+            self.meta["sheet_rows"] = sheet_rows + len(new_raw)
+            self.meta["anchor"] = _anchor(new_raw)
+            old_version = self.meta["version"]
+            self.meta["version"] = hashlib.sha1(
+                (old_version + _fingerprint(delta)).encode()
+            ).hexdigest()[:16]
+            for fn in _APPEND_HOOKS:
+                fn(old_version, self.meta["version"], delta)
+        self.meta["synced_at"] = time.time()
+        return True
+
+    def sync(self, fetch_rows, force=False):
+        """
+        Brings the snapshot up to date and returns the frame. Within SYNC_INTERVAL
+        of the last check this is just an in-memory lookup.
+        """
+        with self._lock:
+            now = time.time()
+            if not force and self.frame is not None and now - self.meta.get("synced_at", 0) < SYNC_INTERVAL:
+                return self.frame
+
+            version = self.version
+            stale = force or now - self.meta.get("full_synced_at", 0) > FULL_REFRESH_INTERVAL
+            if stale or not self._delta_sync(fetch_rows):
+                self._full_sync(fetch_rows)
+                with span("load: save snapshot"):
+                    self._save()
+            elif self.version != version:
+                with span("load: save snapshot"):
+                    self._save()
+            return self.frame
+
+
+_SNAPSHOT = None
+_SNAPSHOT_LOCK = threading.Lock()
+
+
+def get_snapshot():
+    """Returns the shared Snapshot, loading it from disk on first use."""
+    global _SNAPSHOT
+    with _SNAPSHOT_LOCK:
+        if _SNAPSHOT is None:
+            _SNAPSHOT = Snapshot()
+        return _SNAPSHOT
+
+
+def current_snapshot():
+    """The shared Snapshot if something has loaded it, else None (never loads one)."""
+    return _SNAPSHOT
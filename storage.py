@@ -0,0 +1,163 @@
+# storage.py
+"""
+Read/write path for the master log. New cleanups are appended to the end of the
+Google Sheet as rows, so a submission never re-downloads or re-uploads the
+existing archive (and two volunteers saving at once can't overwrite each other).
+Because the sheet only ever grows at the bottom, reads can also start from a
+given row and skip everything that is already cached locally.
+"""
+import math
+import threading
+from datetime import date, datetime
+
+import pandas as pd
+
+from config import ALL_COLUMNS
+
+SECRETS_PATH = ".streamlit/secrets.toml"
+
+
+def _to_cell(value):
+    """Converts a python/numpy/pandas value into something the Sheets API accepts."""
+    if value is None:
+        return ""
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        # numpy / pandas scalars -> plain python
+        try:
+            value = value.item()
+        except (TypeError, ValueError):
+            pass
+    if isinstance(value, float) and math.isnan(value):
+        return ""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def rows_to_values(rows, header):
+    """Lays out a list of row dicts as lists of cells in `header` order."""
+    return [[_to_cell(row.get(col, "")) for col in header] for row in rows]
+
+
+def frame_to_values(df, header):
+    """Same as rows_to_values for a DataFrame, converting column by column."""
+    columns = []
+    for col in header:
+        if col not in df.columns:
+            columns.append([""] * len(df))
+        elif pd.api.types.is_numeric_dtype(df[col]):
+            columns.append(df[col].astype(object).where(df[col].notna(), "").tolist())
+        else:
+            columns.append([_to_cell(v) if v is not pd.NA else "" for v in df[col].tolist()])
+    return [list(r) for r in zip(*columns)]
+
+
+def service_account_info(secrets):
+    """The service account fields of a [connections.gsheets] secrets section."""
+    info = dict(secrets)
+    info.pop("spreadsheet", None)
+    info.pop("worksheet", None)
+    return info
+
+
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def open_worksheet(info, spreadsheet, worksheet=None):
+    """
+    Returns a worksheet (first tab by default) of `spreadsheet`, a URL or key,
+    opened through gspread's public API as the service account `info`. The
+    authorized client is kept per account, so repeated opens don't log in again.
+    """
+    import gspread
+
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(info.get("client_email"))
+        if client is None:
+            client = _CLIENTS[info.get("client_email")] = gspread.service_account_from_dict(info)
+    sh = client.open_by_url(spreadsheet) if spreadsheet.startswith("http") else client.open_by_key(spreadsheet)
+    return sh.worksheet(worksheet) if worksheet else sh.get_worksheet(0)
+
+
+def sync_header(ws):
+    """
+    Makes sure the sheet's header row covers config.ALL_COLUMNS and returns it.
+    Existing columns keep their position; missing ones are added on the right.
+    """
+    header = ws.row_values(1)
+    missing = [c for c in ALL_COLUMNS if c not in header]
+    if not missing:
+        return header
+
+    header = header + missing
+    if len(header) > ws.col_count:
+        ws.add_cols(len(header) - ws.col_count)
+    ws.update(range_name="A1", values=[header])
+    return header
+
+
+def append_to_worksheet(ws, rows, header=None):
+    """
+    Appends `rows` (list of dicts keyed by column name, or a DataFrame) to the
+    bottom of `ws` in a single request. Keys that aren't sheet columns are dropped.
+    Pass the header from sync_header() when appending many batches to skip
+    re-reading it.
+    """
+    if len(rows) == 0:
+        return 0
+
+    header = header or sync_header(ws)
+    values = frame_to_values(rows, header) if isinstance(rows, pd.DataFrame) else rows_to_values(rows, header)
+    ws.append_rows(values, value_input_option="RAW", table_range="A1")
+    return len(rows)
+
+
+def append_rows(info, spreadsheet, rows, worksheet=None):
+    """Appends `rows` to the sheet `spreadsheet` as the service account `info`."""
+    if len(rows) == 0:
+        return 0
+    return append_to_worksheet(open_worksheet(info, spreadsheet, worksheet), rows)
+
+
+def open_worksheet_from_secrets(secrets_path=SECRETS_PATH, worksheet=None):
+    """
+    Opens the master log with the service account in .streamlit/secrets.toml,
+    for command line tools that run outside a Streamlit session.
+    """
+    import tomllib
+
+    with open(secrets_path, "rb") as f:
+        secrets = tomllib.load(f)["connections"]["gsheets"]
+    return open_worksheet(service_account_info(secrets), secrets["spreadsheet"], worksheet)
+
+
+def _values_to_frame(header, body):
+    """Builds a DataFrame from raw sheet values, padding short rows and dropping unnamed columns."""
+    width = len(header)
+    body = [list(r[:width]) + [""] * (width - len(r)) for r in body]
+    df = pd.DataFrame(body, columns=header)
+    df = df.loc[:, [c for c in df.columns if str(c).strip() != ""]]
+    return df.replace("", float("nan"))
+
+
+def read_rows(info, spreadsheet, start_row=2, worksheet=None):
+    """
+    Reads the sheet from `start_row` (1-based, row 1 is the header) to the bottom.
+    Returns a DataFrame with the sheet's header as columns and empty cells as NaN.
+    """
+    ws = open_worksheet(info, spreadsheet, worksheet)
+
+    if start_row <= 2:
+        values = ws.get_all_values()
+        header, body = (values[0], values[1:]) if values else ([], [])
+    else:
+        end_row = max(ws.row_count, start_row)
+        header_range, body = ws.batch_get(["1:1", f"{start_row}:{end_row}"])
+        header = header_range[0] if header_range else []
+
+    return _values_to_frame(header, body)
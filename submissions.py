@@ -0,0 +1,202 @@
+# submissions.py
+"""
+Process-wide queue for New Entry submissions.
+
+The form hands its row to the queue and returns straight away. A background
+writer thread drains everything pending into one batched append, so a burst
+of volunteers saving at once costs one backend request rather than one each.
+Failed appends are retried with exponential backoff and rows are never
+dropped: each accepted row is journaled to disk first and only removed from
+the journal once the backend has it, so rows still pending when the process
+stops are written on the next start.
+
+Submitting the same cleanup twice (same Email, Date, Location and Type of
+cleanup within DEDUPE_WINDOW seconds, e.g. a double click) returns the first
+ticket instead of queueing another row. submit_many() queues a whole grid of
+cleanups in one step, so they are written together; rows within one call are
+never deduplicated against each other, only against earlier submissions.
+"""
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+
+from snapshot import CACHE_DIR
+
+JOURNAL_FILE = "pending_submissions.jsonl"
+MAX_BATCH_ROWS = 500       # rows per append request
+LINGER = 0.5               # seconds to wait for more rows before writing a batch
+DEDUPE_WINDOW = 10 * 60    # seconds a submission blocks an identical one
+DEDUPE_FIELDS = ["Email", "Date", "Location", "Type of cleanup"]
+RETRY_BASE = 1.0           # first retry delay in seconds, doubled per failure
+RETRY_MAX = 60.0
+
+logger = logging.getLogger("rozalia.submissions")
+
+
+def dedupe_key(row):
+    return tuple(str(row.get(f, "")).strip().lower() for f in DEDUPE_FIELDS)
+
+
+class Ticket:
+    """What the submitter gets back. status: "queued", "saved" or "duplicate"."""
+
+    def __init__(self, ticket_id, row, status="queued"):
+        self.id = ticket_id
+        self.row = row
+        self.status = status
+        self.error = None       # last backend error while retrying, if any
+        self.submitted_at = time.time()
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        """Blocks until the row is written (or `timeout` passes); returns True if saved."""
+        return self._done.wait(timeout)
+
+
+class SubmissionQueue:
+    """
+    Coalesces submitted rows into batched `write_batch(rows)` calls on a daemon
+    thread. `on_written(rows)` runs after each successful batch (e.g. to mark
+    the snapshot stale).
+    """
+
+    def __init__(self, write_batch, on_written=None, cache_dir=CACHE_DIR):
+        self.write_batch = write_batch
+        self.on_written = on_written
+        self.journal_path = os.path.join(cache_dir, JOURNAL_FILE)
+        self._cond = threading.Condition()
+        self._pending = []       # tickets not yet written, oldest first
+        self._recent = {}        # dedupe key -> ticket
+        self._ids = itertools.count(1)
+        self.last_error = None
+        os.makedirs(cache_dir, exist_ok=True)
+        for row in self._read_journal():
+            self._pending.append(Ticket(next(self._ids), row))
+        self._thread = threading.Thread(target=self._run, name="submission-writer", daemon=True)
+        self._thread.start()
+
+    # --- JOURNAL ---
+    def _read_journal(self):
+        try:
+            with open(self.journal_path) as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except (OSError, ValueError):
+            return []
+
+    def _write_journal(self):
+        """Rewrites the journal with the rows still pending (called with the lock held)."""
+        tmp = self.journal_path + ".tmp"
+        with open(tmp, "w") as f:
+            for ticket in self._pending:
+                f.write(json.dumps(ticket.row, default=str) + "\n")
+        os.replace(tmp, self.journal_path)
+
+    # --- PUBLIC API ---
+    def submit(self, row):
+        """Queues `row` and returns its Ticket immediately (the earlier one for a duplicate)."""
+        return self.submit_many([row])[0]
+
+    def submit_many(self, rows):
+        """
+        Queues several rows at once, e.g. a grid of cleanups. They are added
+        together, so up to MAX_BATCH_ROWS of them go out in the same append.
+        Returns one Ticket per row, as submit() would; only rows repeating an
+        earlier call's submission come back as duplicates.
+        """
+        now = time.time()
+        tickets, journaled, queued_keys = [], [], set()
+        with self._cond:
+            for k in [k for k, t in self._recent.items() if now - t.submitted_at > DEDUPE_WINDOW]:
+                del self._recent[k]
+            for row in rows:
+                key = dedupe_key(row)
+                earlier = self._recent.get(key)
+                if earlier is not None and key not in queued_keys:
+                    duplicate = Ticket(earlier.id, earlier.row, status="duplicate")
+                    duplicate._done = earlier._done
+                    tickets.append(duplicate)
+                    continue
+                ticket = Ticket(next(self._ids), row)
+                self._recent.setdefault(key, ticket)
+                queued_keys.add(key)
+                tickets.append(ticket)
+                journaled.append(ticket)
+            if journaled:
+                with open(self.journal_path, "a") as f:
+                    f.writelines(json.dumps(t.row, default=str) + "\n" for t in journaled)
+                self._pending.extend(journaled)
+                self._cond.notify()
+        return tickets
+
+    def pending(self):
+        """Number of rows accepted but not yet in the backend."""
+        with self._cond:
+            return len(self._pending)
+
+    def flush(self, timeout=None):
+        """Waits until everything queued so far is written; returns True if it was."""
+        with self._cond:
+            last = self._pending[-1] if self._pending else None
+        return last is None or last.wait(timeout)
+
+    # --- WRITER THREAD ---
+    def _run(self):
+        delay = RETRY_BASE
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            # give a burst a moment to pile up so it goes out as one request
+            time.sleep(LINGER)
+            with self._cond:
+                batch = self._pending[:MAX_BATCH_ROWS]
+
+            try:
+                self.write_batch([t.row for t in batch])
+            except Exception as e:
+                self.last_error = e
+                for t in batch:
+                    t.error = e
+                time.sleep(delay)
+                delay = min(delay * 2, RETRY_MAX)
+                continue
+
+            delay = RETRY_BASE
+            with self._cond:
+                self.last_error = None
+                del self._pending[:len(batch)]
+                # the rows are in the backend now, so a failure below must not stop the writer
+                try:
+                    self._write_journal()
+                except Exception:
+                    logger.exception("Couldn't rewrite %s; it is rewritten again after the next batch",
+                                     self.journal_path)
+            for t in batch:
+                t.status, t.error = "saved", None
+                t._done.set()
+            if self.on_written:
+                try:
+                    self.on_written([t.row for t in batch])
+                except Exception:
+                    logger.exception("on_written failed for a batch of %d row(s)", len(batch))
+
+
+_QUEUE = None
+_QUEUE_LOCK = threading.Lock()
+
+
+def get_submission_queue(write_batch, on_written=None):
+    """The shared SubmissionQueue, started with `write_batch` on first use."""
+    global _QUEUE
+    with _QUEUE_LOCK:
+        if _QUEUE is None:
+            _QUEUE = SubmissionQueue(write_batch, on_written)
+        return _QUEUE
+
+
+def current_submission_queue():
+    """The shared SubmissionQueue if something has started it, else None (never starts one)."""
+    return _QUEUE
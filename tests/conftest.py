@@ -0,0 +1,12 @@
+# tests/conftest.py
+"""Puts the app modules on the path and keeps caches and the site dictionary out of the working tree."""
+import os
+import sys
+import tempfile
+
+_TMP = tempfile.mkdtemp(prefix="rozalia-tests-")
+os.environ.setdefault("ROZALIA_CACHE_DIR", os.path.join(_TMP, "cache"))
+os.environ.setdefault("ROZALIA_SITE_DICT", os.path.join(_TMP, "site_dictionary.json"))
+os.environ.setdefault("ROZALIA_PERF_LOG", "0")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
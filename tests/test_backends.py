@@ -0,0 +1,50 @@
+# tests/test_backends.py
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import bench
+from backends import TABLE, FrameQueries, SQLiteBackend
+from snapshot import normalize_frame
+from units import EFFORT_SUMS, effort_metrics
+
+
+@pytest.fixture(scope="module")
+def rows():
+    rows = bench.generate_rows(500)
+    # some cleanups report no weight, which must not count towards kg per cleanup
+    rows.loc[rows.index % 3 == 0, "Total weight"] = np.nan
+    return rows
+
+
+def test_sqlite_rollup_matches_cube_effort(tmp_path, rows):
+    backend = SQLiteBackend(str(tmp_path / "log.db"))
+    backend.append(rows)
+    in_memory = FrameQueries(normalize_frame(rows.copy()), "test-effort").rollup({}, ["State"])
+    pushed_down = backend.rollup({}, ["State"])
+
+    expected = effort_metrics(in_memory.set_index("X_Axis")).sort_index()
+    actual = effort_metrics(pushed_down.set_index("X_Axis")).sort_index()
+    assert expected.notna().all().all()
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+def test_kg_per_cleanup_only_counts_weighed_cleanups(tmp_path, rows):
+    backend = SQLiteBackend(str(tmp_path / "log.db"))
+    backend.append(rows)
+    total = backend.rollup({}, ["Country"]).iloc[0]
+    assert total["Cleanups (with weight)"] == rows["Total weight"].notna().sum() < total["Cleanups"]
+
+
+def test_effort_sums_backfilled_for_older_databases(tmp_path, rows):
+    path = str(tmp_path / "log.db")
+    SQLiteBackend(path).append(rows.head(20))
+    with sqlite3.connect(path) as con:
+        for col in EFFORT_SUMS:
+            con.execute(f'ALTER TABLE {TABLE} DROP COLUMN "{col}"')
+
+    reopened = SQLiteBackend(path)
+    assert not set(EFFORT_SUMS) & set(reopened.columns)
+    assert reopened.rollup({}, ["Country"]).iloc[0]["Weight (kg)"] > 0
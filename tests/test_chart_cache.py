@@ -0,0 +1,11 @@
+# tests/test_chart_cache.py
+from chart_cache import cache_key, cached
+
+
+def test_none_result_is_cached():
+    builds = []
+    key = cache_key("figure", "test-none")
+    for _ in range(3):
+        assert cached(key, lambda: builds.append(1)) is None
+    assert len(builds) == 1
+
@@ -0,0 +1,82 @@
+# tests/test_main.py
+"""The wake probe against a local stand-in for a Community Cloud app."""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import main
+
+# Community Cloud's shell page; the sleep message is rendered client-side, so it isn't in the HTML
+SHELL_PAGE = "<html><head><title>Streamlit</title></head><body><div id='root'></div></body></html>"
+
+
+class StandInApp(BaseHTTPRequestHandler):
+    """Serves the shell page; the health endpoint answers "ok" only while the app's state is "awake"."""
+
+    def do_GET(self):
+        app = self.server.app
+        if app["state"] == "down":
+            status, body = 503, "Service Unavailable"
+        elif self.path.endswith("_stcore/health"):
+            status, body = (200, "ok") if app["state"] == "awake" else (200, SHELL_PAGE)
+        else:
+            status, body = 200, SHELL_PAGE
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def app():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInApp)
+    server.app = {"state": "awake", "url": f"http://127.0.0.1:{server.server_port}/"}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.app
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def no_pauses(monkeypatch):
+    monkeypatch.setattr(main.time, "sleep", lambda seconds: None)
+
+
+def test_awake_app_needs_no_browser(app, monkeypatch):
+    monkeypatch.setattr(main, "open_in_browser", lambda url: pytest.fail("browser opened for an awake app"))
+    assert main.probe(app["url"], timeout=2) == "awake"
+    assert main.main(["--url", app["url"]]) == 0
+
+
+def test_sleeping_app_answering_200_falls_back_to_browser(app, monkeypatch):
+    app["state"] = "asleep"
+    opened = []
+
+    def wake(url):
+        opened.append(url)
+        app["state"] = "awake"
+        return True
+    monkeypatch.setattr(main, "open_in_browser", wake)
+
+    assert main.probe(app["url"], timeout=2) == "asleep"
+    assert main.main(["--url", app["url"], "--wait", "10"]) == 0
+    assert opened == [app["url"]]
+
+
+def test_unreachable_app_is_retried_then_down(app, monkeypatch):
+    app["state"] = "down"
+    monkeypatch.setattr(main, "open_in_browser", lambda url: pytest.fail("browser opened for a down app"))
+    assert main.probe(app["url"], attempts=2, timeout=2) == "down"
+
+
+def test_probe_only_reports_asleep_without_a_browser(app, monkeypatch):
+    app["state"] = "asleep"
+    monkeypatch.setattr(main, "open_in_browser", lambda url: pytest.fail("browser opened with --probe-only"))
+    assert main.main(["--url", app["url"], "--probe-only"]) == main.EXIT_ASLEEP
+    app["state"] = "awake"
+    assert main.main(["--url", app["url"], "--probe-only"]) == 0
@@ -0,0 +1,49 @@
+# tests/test_new_entry.py
+import pandas as pd
+
+import bench
+import outliers
+import snapshot
+from config import ALL_DEBRIS_ITEMS
+from views.new_entry import _flag_outliers, empty_grid, prepare_grid
+
+
+def grid_of(*cleanups):
+    grid = empty_grid(len(cleanups))
+    for i, (location, kind) in enumerate(cleanups):
+        grid.loc[i, ["Date"]] = "2024-06-01"
+        grid.loc[i, ["Location", "City", "State", "Country", "Name of Organization/Individual", "Email"]] = [
+            location, "Newport", "RI", "USA", "Rozalia Project", "crew@example.org"]
+        grid.loc[i, "Type of cleanup"] = kind
+        grid.loc[i, "Cigarettes"] = 3
+    return grid
+
+
+def test_different_cleanup_types_at_one_site_are_both_accepted():
+    accepted, rejected = prepare_grid(grid_of(("Second Beach", "Beach/Shoreline"), ("Second Beach", "Underwater")))
+    assert len(accepted) == 2 and rejected.empty
+
+
+def test_repeated_cleanup_in_the_grid_is_rejected_before_submit():
+    accepted, rejected = prepare_grid(grid_of(
+        ("Second Beach", "Beach/Shoreline"), ("Fort Adams", "Beach/Shoreline"), ("second beach ", "Beach/Shoreline")))
+    assert accepted["Location"].tolist() == ["Second Beach", "Fort Adams"]
+    assert rejected["Row"].tolist() == [3]
+    assert "as row 1" in rejected["Reason"].iloc[0]
+
+
+def test_submit_flags_only_from_an_already_fitted_detector(monkeypatch, tmp_path):
+    archive = bench.generate_rows(200)
+    huge = pd.DataFrame([{item: 10_000 for item in ALL_DEBRIS_ITEMS}])
+
+    # cold process: nothing loaded, so nothing is read and the row goes out unflagged
+    monkeypatch.setattr(snapshot, "_SNAPSHOT", None)
+    assert _flag_outliers(huge).tolist() == [""]
+
+    loaded = snapshot.Snapshot(str(tmp_path))
+    loaded.sync(bench.LocalSheet(archive).read_rows, force=True)
+    monkeypatch.setattr(snapshot, "_SNAPSHOT", loaded)
+    assert _flag_outliers(huge).tolist() == [""]
+
+    outliers.get_detector(loaded.frame, loaded.version)
+    assert _flag_outliers(huge).tolist() == ["O"]
@@ -0,0 +1,55 @@
+# tests/test_search_index.py
+import pandas as pd
+import pytest
+
+import bench
+from filter_index import get_filter_index
+from search_index import SearchIndex
+
+SITES = pd.DataFrame({
+    "Date": ["2024-06-01"] * 6,
+    "Location": ["Fort Adams State Park", "Oakland Beach", "Second Beach", "Pt Judith Lighthouse",
+                 "Beach 1", "Beach 11"],
+    "City": ["Newport", "Warwick", "Middletown", "Narragansett", "Westport", "Westport"],
+    "Name of Organization/Individual": ["Rozalia Project"] * 6,
+})
+
+
+@pytest.fixture(scope="module")
+def sites():
+    return SearchIndex(get_filter_index(SITES, "test-sites"))
+
+
+@pytest.fixture(scope="module")
+def synthetic():
+    df = bench.generate_rows(3000)
+    return df, SearchIndex(get_filter_index(df, "test-bench"))
+
+
+def test_fuzzy_matches_spelling_variants_only(sites):
+    assert sites.matches("second beach", "fuzzy") == {"Location": ["Second Beach"]}
+    assert sites.matches("ft adams", "fuzzy") == {"Location": ["Fort Adams State Park"]}
+    assert sites.matches("point judith", "fuzzy") == {"Location": ["Pt Judith Lighthouse"]}
+    assert sites.matches("warwik", "fuzzy") == {"City": ["Warwick"]}
+
+
+def test_fuzzy_numbers_must_match(sites):
+    assert sites.matches("beach 1", "fuzzy") == {"Location": ["Beach 1"]}
+    assert sites.matches("beach 1", "contains") == {"Location": ["Beach 1", "Beach 11"]}
+
+
+@pytest.mark.parametrize("query, column, value", [
+    ("town 3", "City", "Town 3"),
+    ("town 1", "City", "Town 1"),
+    ("group 7", "Name of Organization/Individual", "Group 7"),
+])
+def test_fuzzy_narrows_synthetic_rows(synthetic, query, column, value):
+    df, idx = synthetic
+    assert idx.mask(query, "fuzzy").sum() == (df[column] == value).sum()
+
+
+@pytest.mark.parametrize("query, column", [("town 3", "City"), ("group 7", "Name of Organization/Individual")])
+def test_contains_counts(synthetic, query, column):
+    df, idx = synthetic
+    expected = df[column].str.lower().str.contains(query, regex=False).sum()
+    assert 0 < idx.mask(query, "contains").sum() == expected < len(df)
@@ -0,0 +1,41 @@
+# tests/test_sites.py
+from sites import FieldDictionary, SiteDictionary, site_key
+
+
+def test_lookup_merges_into_best_match_not_most_shared_trigrams():
+    d = FieldDictionary(["Goddard Memorial State Park Beach", "Godard Memorial"])
+    assert d.lookup("Goddard Memorial") == (1, False)
+
+
+def test_lookup_keeps_different_numbers_apart():
+    d = FieldDictionary(["Beach 1"])
+    assert d.lookup("Beach 11") == (1, True)
+    assert d.lookup("beach  1") == (0, False)
+
+
+def test_abbreviations_match_known_name():
+    d = FieldDictionary(["Fort Adams State Park"])
+    assert d.lookup("Ft. Adams SP") == (0, False)
+
+
+def test_runtime_additions_start_from_the_seed(tmp_path):
+    seed = SiteDictionary(str(tmp_path / "seed.json"), seed=None)
+    seed.fields["Location"].lookup("Fort Adams State Park")
+    seed.save(bump_revision=True)
+
+    runtime = SiteDictionary(str(tmp_path / "cache" / "runtime.json"), seed=str(tmp_path / "seed.json"))
+    assert runtime.fields["Location"].lookup("Second Beach") == (1, True)
+    runtime.save()
+    assert SiteDictionary(str(tmp_path / "cache" / "runtime.json"), seed=str(tmp_path / "seed.json")).fields[
+        "Location"].names == ["Fort Adams State Park", "Second Beach"]
+
+    # a newer curated seed replaces what the deployment added
+    seed.fields["Location"].lookup("Goddard Memorial")
+    seed.save(bump_revision=True)
+    reloaded = SiteDictionary(str(tmp_path / "cache" / "runtime.json"), seed=str(tmp_path / "seed.json"))
+    assert reloaded.fields["Location"].names == ["Fort Adams State Park", "Goddard Memorial"]
+
+
+def test_ordinary_word_is_is_not_expanded():
+    assert site_key("What is Left Cleanup Crew") == "what is left cleanup crew"
+    assert site_key("Ft. Adams SP") == "fort adams state park"
@@ -0,0 +1,33 @@
+# tests/test_snapshot.py
+import bench
+from bench import LocalSheet
+from snapshot import Snapshot
+
+
+def test_full_refresh_of_unchanged_rows_keeps_the_delta_version(tmp_path):
+    rows = bench.generate_rows(200)
+    sheet = LocalSheet(rows.head(150))
+    snapshot = Snapshot(str(tmp_path))
+    snapshot.sync(sheet.read_rows, force=True)
+
+    sheet.append(rows.iloc[150:])
+    snapshot.mark_stale()
+    snapshot.sync(sheet.read_rows)
+    delta_version = snapshot.version
+    assert len(snapshot.frame) == 200
+
+    snapshot.sync(sheet.read_rows, force=True)
+    assert snapshot.version == delta_version
+
+
+def test_full_refresh_picks_up_edits(tmp_path):
+    rows = bench.generate_rows(100)
+    sheet = LocalSheet(rows)
+    snapshot = Snapshot(str(tmp_path))
+    snapshot.sync(sheet.read_rows, force=True)
+    before = snapshot.version
+
+    sheet.rows.loc[10, "City"] = "Edited Town"
+    snapshot.sync(sheet.read_rows, force=True)
+    assert snapshot.version != before
+    assert "Edited Town" in set(snapshot.frame["City"].astype(str))
@@ -0,0 +1,91 @@
+# tests/test_submissions.py
+import json
+import os
+import time
+
+import pandas as pd
+import pytest
+
+import submissions
+from bench import LocalSheet
+from config import ALL_COLUMNS
+from submissions import JOURNAL_FILE, SubmissionQueue
+
+
+@pytest.fixture(autouse=True)
+def fast_writer(monkeypatch):
+    monkeypatch.setattr(submissions, "LINGER", 0.01)
+    monkeypatch.setattr(submissions, "RETRY_BASE", 0.05)
+
+
+@pytest.fixture
+def sheet():
+    return LocalSheet(pd.DataFrame(columns=ALL_COLUMNS))
+
+
+def row(location="Second Beach", kind="Beach/Shoreline", email="a@example.org"):
+    return {"Email": email, "Date": "2024-06-01", "Location": location, "Type of cleanup": kind}
+
+
+def test_journal_replayed_after_crash(tmp_path, sheet):
+    # rows accepted by a process that stopped before its writer got to them
+    with open(tmp_path / JOURNAL_FILE, "w") as f:
+        for r in [row("Beach 1"), row("Beach 2")]:
+            f.write(json.dumps(r) + "\n")
+
+    queue = SubmissionQueue(sheet.append, cache_dir=str(tmp_path))
+    assert queue.flush(timeout=5)
+    assert sheet.rows["Location"].tolist() == ["Beach 1", "Beach 2"]
+    assert os.path.getsize(tmp_path / JOURNAL_FILE) == 0
+
+
+def test_duplicate_of_an_earlier_batch_is_not_written_again(tmp_path, sheet):
+    queue = SubmissionQueue(sheet.append, cache_dir=str(tmp_path))
+    first = queue.submit(row())
+    assert first.wait(timeout=5)
+
+    again = queue.submit(row())
+    assert again.status == "duplicate" and again.id == first.id
+    assert queue.flush(timeout=5)
+    assert len(sheet.rows) == 1
+
+
+def test_failed_append_is_retried_with_backoff(tmp_path, sheet):
+    calls = []
+
+    def flaky_append(rows):
+        calls.append(time.monotonic())
+        if len(calls) < 3:
+            raise ConnectionError("sheet unavailable")
+        return sheet.append(rows)
+
+    queue = SubmissionQueue(flaky_append, cache_dir=str(tmp_path))
+    ticket = queue.submit(row())
+    assert ticket.wait(timeout=5)
+    assert ticket.status == "saved" and ticket.error is None
+    assert len(sheet.rows) == 1
+    first_wait, second_wait = calls[1] - calls[0], calls[2] - calls[1]
+    assert first_wait >= submissions.RETRY_BASE
+    assert second_wait >= 2 * submissions.RETRY_BASE
+
+
+def test_writer_survives_a_failing_on_written(tmp_path, sheet):
+    def on_written(rows):
+        raise RuntimeError("snapshot unavailable")
+
+    queue = SubmissionQueue(sheet.append, on_written=on_written, cache_dir=str(tmp_path))
+    assert queue.submit(row("Beach 1")).wait(timeout=5)
+    assert queue.submit(row("Beach 2")).wait(timeout=5)
+    assert sheet.rows["Location"].tolist() == ["Beach 1", "Beach 2"]
+
+
+def test_rows_within_one_batch_are_all_written(tmp_path, sheet):
+    queue = SubmissionQueue(sheet.append, cache_dir=str(tmp_path))
+    rows = [row(kind="Beach/Shoreline"), row(kind="Underwater"), row(kind="Beach/Shoreline")]
+    tickets = queue.submit_many(rows)
+    assert [t.status for t in tickets] == ["queued"] * 3
+    assert queue.flush(timeout=5)
+    assert sheet.rows["Type of cleanup"].tolist() == ["Beach/Shoreline", "Underwater", "Beach/Shoreline"]
+
+    # a later submission of either cleanup is still a duplicate
+    assert queue.submit(row(kind="Underwater")).status == "duplicate"
@@ -0,0 +1,20 @@
+# tests/test_totals.py
+import bench
+import totals
+from backends import SQLiteBackend
+
+
+def test_recompute_fixes_stored_totals_in_the_database(tmp_path, capsys):
+    path = str(tmp_path / "log.db")
+    rows = bench.generate_rows(50)
+    rows.loc[[3, 7], "Total (All)"] += 5
+    rows.loc[7, "Total Foam Items"] = 0
+    SQLiteBackend(path).append(rows)
+
+    assert totals.main(["check", "--db", path]) == 1
+    assert "2 of 50 rows" in capsys.readouterr().out
+    assert totals.main(["recompute", "--db", path]) == 0
+    assert totals.main(["check", "--db", path]) == 0
+
+    stored = SQLiteBackend(path).read_rows()
+    assert stored["Total (All)"].tolist() == totals.compute_totals(rows)["Total (All)"].tolist()
@@ -0,0 +1,167 @@
+# totals.py
+"""
+Summary totals ("Total Plastic Items (excluding Foam)", ..., "Total (All)")
+computed from config.SUMMARY_TOTAL_SOURCES.
+
+The config is turned into an items x totals 0/1 membership matrix, so totals
+for any number of rows are one matrix product. Used by the entry form, bulk
+imports and the archive maintenance command below, which checks or fixes the
+stored totals of the master log itself (the Google Sheet, or the SQLite
+database with --db / ROZALIA_BACKEND=sqlite) or of an export file:
+
+    python totals.py check
+    python totals.py recompute --db .cache/master_log.db
+    python totals.py check archive.csv
+    python totals.py recompute archive.csv -o fixed.csv
+"""
+import argparse
+import sqlite3
+import sys
+
+import numpy as np
+import pandas as pd
+
+from config import ALL_DEBRIS_ITEMS, SUMMARY_TOTAL_SOURCES
+
+TOTAL_COLUMNS = list(SUMMARY_TOTAL_SOURCES)
+
+
+def membership_matrix():
+    """Items x totals frame with 1 where the item counts towards the total."""
+    matrix = pd.DataFrame(0, index=ALL_DEBRIS_ITEMS, columns=TOTAL_COLUMNS, dtype=np.int64)
+    for total, items in SUMMARY_TOTAL_SOURCES.items():
+        unknown = [i for i in items if i not in matrix.index]
+        if unknown:
+            raise ValueError(f"{total} refers to unknown debris items: {unknown}")
+        matrix.loc[items, total] = 1
+    return matrix
+
+
+_MATRIX = membership_matrix()
+
+
+def compute_totals(df):
+    """Returns the summary totals for every row of `df` (missing/blank counts count as 0)."""
+    counts = df.reindex(columns=ALL_DEBRIS_ITEMS).apply(pd.to_numeric, errors="coerce").fillna(0)
+    values = counts.to_numpy()
+    if np.issubdtype(values.dtype, np.floating) and np.all(np.mod(values, 1) == 0):
+        values = values.astype(np.int64)
+    return pd.DataFrame(values @ _MATRIX.to_numpy(), index=df.index, columns=TOTAL_COLUMNS)
+
+
+def row_totals(counts):
+    """Totals for a single entry given as {item: count}."""
+    return dict(zip(TOTAL_COLUMNS, compute_totals(pd.DataFrame([counts])).iloc[0].tolist()))
+
+
+def apply_totals(df):
+    """Returns a copy of `df` with all summary total columns (re)computed."""
+    df = df.copy()
+    df[TOTAL_COLUMNS] = compute_totals(df)
+    return df
+
+
+def find_mismatches(df):
+    """Rows whose stored totals differ from the recomputed ones, with the recomputed values alongside."""
+    expected = compute_totals(df)
+    stored = df.reindex(columns=TOTAL_COLUMNS).apply(pd.to_numeric, errors="coerce").fillna(0)
+    bad = (stored.to_numpy() != expected.to_numpy()).any(axis=1)
+    return df[bad].join(expected[bad].add_prefix("Expected "))
+
+
+def _read(path):
+    return pd.read_excel(path) if path.lower().endswith((".xlsx", ".xls")) else pd.read_csv(path)
+
+
+def _write(df, path):
+    """Writes `df` in the format `path`'s extension names (.xlsx or .csv)."""
+    if path.lower().endswith(".xlsx"):
+        df.to_excel(path, index=False)
+    elif path.lower().endswith(".csv"):
+        df.to_csv(path, index=False)
+    else:
+        raise ValueError(f"can't write {path}: use a .csv or .xlsx path")
+
+
+def sqlite_totals(path, fix=False):
+    """
+    Finds (and with `fix`, rewrites) rows of the local SQLite master log whose
+    stored totals don't match their counts. Returns (rows checked, rows mismatched).
+    """
+    from backends import TABLE, SQLiteBackend, _q
+
+    SQLiteBackend(path)  # makes sure the table has every total column
+    columns = ", ".join(_q(c) for c in ALL_DEBRIS_ITEMS + TOTAL_COLUMNS)
+    with sqlite3.connect(path) as con:
+        df = pd.read_sql_query(f"SELECT row_id, {columns} FROM {TABLE}", con, index_col="row_id")
+        bad = find_mismatches(df)
+        if fix and len(bad):
+            expected = compute_totals(df.loc[bad.index])
+            sets = ", ".join(f"{_q(c)} = ?" for c in TOTAL_COLUMNS)
+            rows = zip(expected.index, expected.to_numpy().tolist())
+            con.executemany(f"UPDATE {TABLE} SET {sets} WHERE row_id = ?",
+                            [values + [int(row_id)] for row_id, values in rows])
+    return len(df), len(bad)
+
+
+def sheet_totals(ws, fix=False):
+    """sqlite_totals for the Google Sheet worksheet `ws`; only the mismatched total cells are rewritten."""
+    from gspread.utils import rowcol_to_a1
+    from storage import _values_to_frame, sync_header
+
+    values = ws.get_all_values()
+    df = _values_to_frame(values[0], values[1:]) if values else pd.DataFrame(columns=TOTAL_COLUMNS)
+    bad = find_mismatches(df)
+    if fix and len(bad):
+        header = sync_header(ws)
+        expected = compute_totals(df.loc[bad.index])
+        updates = [{"range": rowcol_to_a1(i + 2, header.index(col) + 1), "values": [[v]]}
+                   for col in TOTAL_COLUMNS for i, v in zip(expected.index, expected[col].tolist())]
+        ws.batch_update(updates, value_input_option="RAW")
+    return len(df), len(bad)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate or recompute the summary totals of the master log.")
+    parser.add_argument("command", choices=["check", "recompute"])
+    parser.add_argument("path", nargs="?", help="CSV/XLSX export to work on instead of the master log")
+    parser.add_argument("--db", help="the local SQLite master log at this path instead of the Google Sheet")
+    parser.add_argument("-o", "--output", help="where to write the recomputed export (recompute with a path only)")
+    args = parser.parse_args(argv)
+
+    if args.path is None:
+        if args.output:
+            parser.error("-o only applies when recomputing an export file")
+        from backends import BACKEND, DB_PATH
+
+        fix = args.command == "recompute"
+        if args.db or BACKEND == "sqlite":
+            where = args.db or DB_PATH
+            n_rows, n_bad = sqlite_totals(where, fix)
+        else:
+            from storage import open_worksheet_from_secrets
+
+            where = "the Google Sheet"
+            n_rows, n_bad = sheet_totals(open_worksheet_from_secrets(), fix)
+        if fix:
+            print(f"Recomputed totals for {n_bad:,} of {n_rows:,} rows in {where}")
+            return 0
+        print(f"{n_bad:,} of {n_rows:,} rows in {where} have totals that don't match their item counts")
+        return 1 if n_bad else 0
+
+    df = _read(args.path)
+    if args.command == "check":
+        bad = find_mismatches(df)
+        print(f"{len(bad):,} of {len(df):,} rows have totals that don't match their item counts")
+        return 1 if len(bad) else 0
+
+    out = args.output or args.path
+    if not out.lower().endswith((".csv", ".xlsx")):
+        parser.error(f"can't write {out} in place; pass -o with a .csv or .xlsx path")
+    _write(apply_totals(df), out)
+    print(f"Recomputed totals for {len(df):,} rows -> {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+# trends.py
+"""
+Materialized monthly rollups per Location and per State, for trend charts.
+
+Each rollup has one row per (site or state, month) holding the sums needed
+for rates: cleanups, pieces (overall and per summary total), hours and
+participants, plus pieces from the cleanups that reported hours or
+participants so the per-hour/per-participant rates only divide like by like.
+They are built once, written next to the snapshot, and when the snapshot
+appends rows (e.g. a New Entry submission) only the new rows are grouped
+and folded in. The Dashboard's trends view reads nothing but these tables,
+so its cost depends on sites x months, not on the size of the archive.
+"""
+import json
+import os
+import threading
+
+import pandas as pd
+
+from snapshot import CACHE_DIR, register_append_hook
+from totals import TOTAL_COLUMNS
+from units import EFFORT_COLUMNS, EFFORT_SUMS, effort_columns, effort_sums
+
+LEVELS = ["Location", "State"]
+MONTH_COL = "Month start"
+MATERIAL_TOTALS = [t for t in TOTAL_COLUMNS if t != "Total (All)"]
+SUM_COLUMNS = (["Cleanups", "Pieces", "Hours", "Participants", "Pieces (timed)", "Pieces (with headcount)"]
+               + EFFORT_SUMS + MATERIAL_TOTALS)
+METRICS = {
+    "Items per cleanup": ("Pieces", "Cleanups"),
+    "Items per hour": ("Pieces (timed)", "Hours"),
+    "Items per participant": ("Pieces (with headcount)", "Participants"),
+    "Items per km": ("Pieces (with distance)", "Distance (km)"),
+    "Items per participant-hour": ("Pieces (with effort)", "Participant-hours"),
+    "Kg per cleanup": ("Weight (kg)", "Cleanups (with weight)"),
+    "Cleanups": ("Cleanups", None),
+}
+TRENDS_FILE = "trends_{level}.parquet"
+TRENDS_META = "trends.json"
+TRENDS_FORMAT = 3  # bump when SUM_COLUMNS changes so stored rollups are rebuilt
+
+
+def monthly_sums(df, level):
+    """Groups raw rows into per-(level value, month) sums; rows without a Date or `level` value are skipped."""
+    months = pd.to_datetime(df["Date"], errors="coerce").dt.to_period("M").dt.to_timestamp()
+    pieces = pd.to_numeric(df["Total (All)"], errors="coerce").fillna(0)
+    effort = df[EFFORT_COLUMNS] if set(EFFORT_COLUMNS) <= set(df.columns) else effort_columns(df)
+    hours, people = effort["Hours"], effort["Participants"]
+    timed = hours.notna()
+    counted = people.notna()
+
+    frame = pd.DataFrame({
+        level: df[level].astype("string"),
+        MONTH_COL: months,
+        "Cleanups": 1,
+        "Pieces": pieces,
+        "Hours": hours.where(timed, 0),
+        "Participants": people.where(counted, 0),
+        "Pieces (timed)": pieces.where(timed, 0),
+        "Pieces (with headcount)": pieces.where(counted, 0),
+    })
+    frame[EFFORT_SUMS] = effort_sums(df)
+    for col in MATERIAL_TOTALS:
+        frame[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+    frame = frame.dropna(subset=[level, MONTH_COL])
+    return frame.groupby([level, MONTH_COL], sort=True)[SUM_COLUMNS].sum()
+
+
+class MonthlyRollups:
+    """Per-level monthly sums, indexed by (level value, month start)."""
+
+    def __init__(self, tables):
+        self.tables = tables
+
+    @classmethod
+    def from_rows(cls, df):
+        return cls({level: monthly_sums(df, level) for level in LEVELS})
+
+    def append(self, delta):
+        """A new rollup with `delta`'s rows added; only the delta is grouped."""
+        return MonthlyRollups({
+            level: table.add(monthly_sums(delta, level), fill_value=0)
+            for level, table in self.tables.items()
+        })
+
+    def top(self, level, n=5):
+        """The `n` values of `level` with the most cleanups."""
+        counts = self.tables[level]["Cleanups"].groupby(level=0).sum()
+        return counts.nlargest(n).index.tolist()
+
+    def options(self, level):
+        return sorted(self.tables[level].index.get_level_values(0).unique())
+
+    def series(self, level, keys, metric="Items per cleanup"):
+        """Long (level value, Month start, metric) frame for `keys`; months without a denominator are dropped."""
+        num, den = METRICS[metric]
+        table = self.tables[level]
+        table = table[table.index.get_level_values(0).isin(keys)]
+        values = table[num] if den is None else table[num] / table[den].where(table[den] > 0)
+        return values.rename(metric).dropna().reset_index()
+
+    # --- STORAGE ---
+    def save(self, version, cache_dir=CACHE_DIR):
+        os.makedirs(cache_dir, exist_ok=True)
+        for level, table in self.tables.items():
+            path = os.path.join(cache_dir, TRENDS_FILE.format(level=level.lower()))
+            table.reset_index().to_parquet(path + ".tmp", index=False)
+            os.replace(path + ".tmp", path)
+        with open(os.path.join(cache_dir, TRENDS_META), "w") as f:
+            json.dump({"version": version, "format": TRENDS_FORMAT}, f)
+
+    @classmethod
+    def load(cls, version, cache_dir=CACHE_DIR):
+        """The stored rollups if they were saved for `version`, else None."""
+        try:
+            with open(os.path.join(cache_dir, TRENDS_META)) as f:
+                meta = json.load(f)
+            if meta.get("version") != version or meta.get("format") != TRENDS_FORMAT:
+                return None
+            tables = {}
+            for level in LEVELS:
+                path = os.path.join(cache_dir, TRENDS_FILE.format(level=level.lower()))
+                tables[level] = pd.read_parquet(path).set_index([level, MONTH_COL])
+        except (OSError, ValueError, KeyError):
+            return None
+        return cls(tables)
+
+
+# --- CACHE PER DATA VERSION ---
+_LOCK = threading.Lock()
+_ROLLUPS = {}  # version -> MonthlyRollups
+
+
+def get_trends(df, version):
+    """The monthly rollups for this data version: from memory, then disk, else built from `df`."""
+    with _LOCK:
+        rollups = _ROLLUPS.get(version)
+        if rollups is None:
+            rollups = MonthlyRollups.load(version)
+            if rollups is None:
+                rollups = MonthlyRollups.from_rows(df)
+                rollups.save(version)
+            _ROLLUPS.clear()
+            _ROLLUPS[version] = rollups
+        return rollups
+
+
+def _on_append(old_version, new_version, delta):
+    """Folds appended rows into the current rollups and stores them under the new version."""
+    with _LOCK:
+        rollups = _ROLLUPS.pop(old_version, None)
+        _ROLLUPS.clear()
+        if rollups is not None:
+            rollups = _ROLLUPS[new_version] = rollups.append(delta)
+            rollups.save(new_version)
+
+
+register_append_hook(_on_append)
@@ -0,0 +1,112 @@
+# units.py
+"""
+Effort fields parsed into canonical numbers, and the density metrics built on them.
+
+"Total weight" and "Distance cleaned" are free text with a separate free-text
+unit ("12.5" + "lbs", or just "3 miles"), and "Duration (hrs)" and
+"# of participants" arrive as strings. effort_columns() turns all four into
+kg, km, hours and people in one vectorized pass: numbers are pulled out with
+a regex, units looked up in alias tables, and zero/unparseable values become
+NA (the form's 0 means "not reported"). A blank unit falls back to the one the
+New Entry form has always implied (pounds, miles).
+
+Rates need matching numerators and denominators, so the sums that go into
+the rollup cube count pieces (and, for kg per cleanup, cleanups) only from
+cleanups that reported the effort in question; effort_metrics() turns those
+sums into per-group rates.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+WEIGHT_UNITS = {  # -> kg
+    "kg": 1.0, "kgs": 1.0, "kilo": 1.0, "kilos": 1.0, "kilogram": 1.0, "kilograms": 1.0,
+    "lb": 0.45359237, "lbs": 0.45359237, "pound": 0.45359237, "pounds": 0.45359237,
+    "oz": 0.028349523, "ounce": 0.028349523, "ounces": 0.028349523,
+    "g": 0.001, "gram": 0.001, "grams": 0.001,
+    "ton": 907.18474, "tons": 907.18474, "tonne": 1000.0, "tonnes": 1000.0,
+}
+DISTANCE_UNITS = {  # -> km
+    "km": 1.0, "kms": 1.0, "kilometer": 1.0, "kilometers": 1.0, "kilometre": 1.0, "kilometres": 1.0,
+    "mi": 1.609344, "mile": 1.609344, "miles": 1.609344,
+    "m": 0.001, "meter": 0.001, "meters": 0.001, "metre": 0.001, "metres": 0.001,
+    "ft": 0.0003048, "foot": 0.0003048, "feet": 0.0003048,
+    "yd": 0.0009144, "yard": 0.0009144, "yards": 0.0009144,
+}
+DEFAULT_WEIGHT_UNIT = "lbs"
+DEFAULT_DISTANCE_UNIT = "miles"
+
+# Row-level columns added to the master frame
+EFFORT_COLUMNS = ["Weight (kg)", "Distance (km)", "Hours", "Participants", "Participant-hours",
+                  "Items per km", "Items per participant-hour"]
+# Additive columns summed into the rollup cube
+EFFORT_SUMS = ["Weight (kg)", "Distance (km)", "Participant-hours", "Pieces (with distance)", "Pieces (with effort)",
+               "Cleanups (with weight)"]
+# Group-level rates from EFFORT_SUMS: name -> (numerator, denominator)
+EFFORT_METRICS = {
+    "Items per km": ("Pieces (with distance)", "Distance (km)"),
+    "Items per participant-hour": ("Pieces (with effort)", "Participant-hours"),
+    "Kg per cleanup": ("Weight (kg)", "Cleanups (with weight)"),
+}
+
+_QUANTITY = re.compile(r"(\d[\d,]*\.?\d*|\.\d+)\s*([a-zA-Z]*)")
+
+
+def _quantity(values):
+    """(number, unit text found after it) for each value; number is NA when there is none or it is <= 0."""
+    parts = values.astype("string").str.extract(_QUANTITY)
+    number = pd.to_numeric(parts[0].str.replace(",", "", regex=False), errors="coerce")
+    return number.where(number > 0), parts[1].str.lower()
+
+
+def _unit_factor(units, inline_units, table, default):
+    """Conversion factor per row from the unit column, else a unit written after the number, else `default`."""
+    units = units.astype("string").str.strip().str.lower().str.rstrip(".")
+    units = units.mask(units.isin(["", "none", "nan"]))
+    units = units.fillna(inline_units.mask(inline_units == "")).fillna(default)
+    return units.map(table).astype("float64")
+
+
+def effort_columns(df):
+    """EFFORT_COLUMNS for every row of a raw or typed master frame, as float64 with NA for unknown."""
+    weight, weight_inline = _quantity(df["Total weight"])
+    distance, distance_inline = _quantity(df["Distance cleaned"])
+    hours, _ = _quantity(df["Duration (hrs)"])
+    people, _ = _quantity(df["# of participants"])
+    pieces = pd.to_numeric(df["Total (All)"], errors="coerce").astype("float64")
+
+    out = pd.DataFrame(index=df.index)
+    out["Weight (kg)"] = weight * _unit_factor(df["Units (Total weight)"], weight_inline, WEIGHT_UNITS, DEFAULT_WEIGHT_UNIT)
+    out["Distance (km)"] = distance * _unit_factor(df["Units (Distance cleaned)"], distance_inline, DISTANCE_UNITS, DEFAULT_DISTANCE_UNIT)
+    out["Hours"] = hours
+    out["Participants"] = people.round()
+    out["Participant-hours"] = out["Hours"] * out["Participants"]
+    out["Items per km"] = pieces / out["Distance (km)"]
+    out["Items per participant-hour"] = pieces / out["Participant-hours"]
+    return out.astype("float64")
+
+
+def effort_sums(df):
+    """EFFORT_SUMS per row (NA as 0), ready to be summed by any grouping."""
+    effort = df[EFFORT_COLUMNS] if set(EFFORT_COLUMNS) <= set(df.columns) else effort_columns(df)
+    pieces = pd.to_numeric(df["Total (All)"], errors="coerce").fillna(0).astype("float64")
+    out = pd.DataFrame({
+        "Weight (kg)": effort["Weight (kg)"],
+        "Distance (km)": effort["Distance (km)"],
+        "Participant-hours": effort["Participant-hours"],
+        "Pieces (with distance)": pieces.where(effort["Distance (km)"].notna()),
+        "Pieces (with effort)": pieces.where(effort["Participant-hours"].notna()),
+        "Cleanups (with weight)": effort["Weight (kg)"].notna().astype("float64"),
+    }, index=df.index)
+    return out.fillna(0.0)
+
+
+def effort_metrics(grouped):
+    """EFFORT_METRICS for each row of summed data (cube cells or a rollup); NA where the denominator is 0."""
+    out = pd.DataFrame(index=grouped.index)
+    for name, (num, den) in EFFORT_METRICS.items():
+        if num in grouped.columns and den in grouped.columns:
+            denominator = grouped[den].astype("float64")
+            out[name] = grouped[num].astype("float64") / denominator.where(denominator > 0, np.nan)
+    return out
@@ -0,0 +1,29 @@
+# views/__init__.py
+"""
+The app's sidebar sections, one module each, imported only when shown.
+
+Every module has a render() that draws its page. Heavy imports (plotly, the
+Google Sheets connection, the archive's indexes) live in the modules that use
+them, and only the pages that show archive data load it, so the New Entry
+form renders without reading the archive. The package is called views/
+rather than pages/ so Streamlit doesn't build its own multipage navigation
+from it.
+"""
+import importlib
+
+from perf import span
+
+SECTIONS = {
+    "New Entry": "views.new_entry",
+    "Bulk Import": "views.bulk",
+    "History": "views.history",
+    "Dashboard": "views.dashboard",
+    "Admin": "views.admin",  # hidden unless the URL has ?admin=1
+}
+
+
+def render(section):
+    """Imports the section's module (first time only) and draws the page."""
+    with span("page: import"):
+        module = importlib.import_module(SECTIONS[section])
+    module.render()
@@ -0,0 +1,31 @@
+# views/admin.py
+"""PERFORMANCE (hidden, ?admin=1): rerun timings, chart cache and warm-up state, and a one-off profiler."""
+import streamlit as st
+
+from chart_cache import cache_stats
+from perf import reset as reset_stats, stage_stats
+from warmup import warmup_status
+
+
+def render():
+    st.title("PERFORMANCE")
+    st.caption("Time per rerun stage in this server process, most recent reruns per page.")
+    st.dataframe(stage_stats(), use_container_width=True)
+    chart_stats = cache_stats()
+    st.caption(f"Chart cache: {chart_stats['entries']} entries, {chart_stats['bytes'] / 1e6:.1f} MB, "
+               f"{chart_stats['hits']} hits / {chart_stats['misses']} misses")
+
+    warm = warmup_status()
+    warm_steps = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in warm["steps"].items())
+    st.caption(f"Cache warm-up: {warm['state']}" + (f" ({warm_steps})" if warm_steps else "")
+               + (f", error: {warm['error']}" if warm["error"] else ""))
+
+    a1, a2 = st.columns(2)
+    if a1.button("PROFILE NEXT RERUN"):
+        st.session_state["perf_profile_next"] = True
+        st.info("The next rerun (e.g. switching to the page you want to measure) will be captured with cProfile.")
+    if a2.button("RESET TIMINGS"):
+        reset_stats()
+    if "perf_profile_report" in st.session_state:
+        st.markdown(f"**cProfile of the last captured rerun ({st.session_state['perf_profile_page']})**")
+        st.code(st.session_state["perf_profile_report"])
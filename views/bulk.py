@@ -0,0 +1,52 @@
+# views/bulk.py
+"""BULK IMPORT: validate a CSV/XLSX of past cleanups and append the good rows in batches."""
+import streamlit as st
+
+from bulk_import import run_import
+from snapshot import get_snapshot
+from views.common import get_backend, load_data
+
+
+def render():
+    st.title("BULK IMPORT")
+    st.info("Upload a CSV or XLSX of past cleanups. Columns are matched to the entry form fields by name; "
+            "rows that fail validation are skipped and listed below.")
+
+    upload = st.file_uploader("CLEANUP SPREADSHEET", type=["csv", "xlsx"])
+    dry_run = st.checkbox("VALIDATE ONLY (DON'T SAVE)")
+
+    if upload is not None and st.button("START IMPORT"):
+        progress = st.empty()
+        try:
+            if dry_run:
+                write_batch = lambda rows: None
+            else:
+                write_batch = get_backend().writer()
+
+            # imported rows carry the Outlier flag like entries from the form
+            from outliers import get_detector
+
+            df, data_version = load_data()
+            detector = get_detector(df, data_version) if not df.empty else None
+
+            report = run_import(upload, write_batch, name=upload.name, detector=detector,
+                                on_progress=lambda r: progress.markdown(f"**{r.summary()}**"))
+        except Exception as e:
+            st.error(f"Import Failed: {e}")
+        else:
+            if report.accepted and not dry_run:
+                get_snapshot().mark_stale()
+                st.cache_data.clear()
+            st.success(report.summary())
+            if report.unknown_columns:
+                st.warning(f"Ignored columns: {', '.join(map(str, report.unknown_columns))}")
+            if report.rejected:
+                rejects = report.rejects
+                st.markdown(f"**REJECTED ROWS** (first {len(rejects):,} shown)")
+                st.dataframe(rejects, use_container_width=True)
+                st.download_button(
+                    label="DOWNLOAD REJECTED ROWS",
+                    data=rejects.to_csv(index=False).encode('utf-8-sig'),
+                    file_name="rejected_rows.csv",
+                    mime="text/csv"
+                )
@@ -0,0 +1,113 @@
+# views/common.py
+"""
+The backend, the submission queue and the master frame, shared by the sections.
+
+The archive stack (backends, snapshot, master frame) is imported inside the
+functions that need it, so importing this module stays cheap for pages that
+never touch the data.
+"""
+import pandas as pd
+import streamlit as st
+
+from perf import span
+
+ROZALIA_PALETTE = ["#7BB3CC", "#E8A85D", "#92AD94", "#A4C3B2", "#BC6C25", "#8D99AE", "#D4A373", "#788794", "#E9EDC9"]
+
+
+def get_backend():
+    """The master log's storage: the Google Sheet, or a local SQLite file with ROZALIA_BACKEND=sqlite."""
+    from backends import BACKEND, GSheetsBackend, get_local_backend
+
+    if BACKEND == "sqlite":
+        return get_local_backend()
+    from storage import service_account_info
+
+    secrets = st.secrets["connections"]["gsheets"]
+    return GSheetsBackend(service_account_info(secrets), secrets["spreadsheet"])
+
+
+def get_submissions(backend=None):
+    """The shared submission queue; written rows make the next sync pick them up."""
+    from snapshot import get_snapshot
+    from submissions import get_submission_queue
+
+    backend = backend or get_backend()
+    return get_submission_queue(backend.append, on_written=lambda rows: get_snapshot().mark_stale())
+
+
+def load_and_sync_data(backend=None):
+    """
+    Returns the normalized master log from the local snapshot, pulling only
+    rows added to the backend since the last sync.
+    """
+    from backends import BACKEND
+    from snapshot import get_snapshot
+
+    snapshot = get_snapshot()
+    try:
+        return snapshot.sync((backend or get_backend()).read_rows)
+
+    except Exception as e:
+        st.error(f"Error connecting to {'SQLite' if BACKEND == 'sqlite' else 'Google Sheets'}: {e}")
+        # Serve the last good snapshot rather than nothing
+        return snapshot.frame if snapshot.frame is not None else pd.DataFrame()
+
+
+def load_data():
+    """
+    (master frame, data version) for pages that show the archive. One derived
+    frame per data version for the whole process; each session gets a
+    zero-copy view. The frame is empty if nothing could be loaded.
+    """
+    from master import get_master_frame
+    from snapshot import get_snapshot
+
+    with span("load: sync"):
+        df = load_and_sync_data()
+    data_version = get_snapshot().version
+    if not df.empty:
+        df = get_master_frame(df, data_version)
+    return df, data_version
+
+
+def warm_up_steps(backend):
+    """
+    What the first session after a cold start builds in the background: the
+    snapshot and master frame, then the per-version caches each section reads.
+    """
+    from master import get_master_frame
+    from snapshot import get_snapshot
+
+    loaded = {}
+
+    def load():
+        snapshot = get_snapshot()
+        frame = snapshot.sync(backend.read_rows)
+        loaded["version"] = snapshot.version
+        loaded["df"] = get_master_frame(frame, snapshot.version)
+
+    def later(build):
+        return lambda: build(loaded["df"], loaded["version"])
+
+    def outlier_stats(df, data_version):
+        from outliers import get_detector
+        get_detector(df, data_version)
+
+    def search_index(df, data_version):
+        from search_index import get_search_index
+        get_search_index(df, data_version)
+
+    def dashboard(step):
+        def build(df, data_version):
+            import views.dashboard
+            getattr(views.dashboard, step)(df, data_version, backend)
+        return build
+
+    return [
+        ("data snapshot", load),
+        ("outlier stats", later(outlier_stats)),
+        ("history search index", later(search_index)),
+        ("dashboard cube + indexes", later(dashboard("warm_indexes"))),
+        ("dashboard default view", later(dashboard("warm_default_view"))),
+        ("monthly trends", later(dashboard("warm_trends"))),
+    ]
@@ -0,0 +1,277 @@
+# views/dashboard.py
+"""
+DATA DASHBOARD: filters, group-bys and charts over the rollup cube.
+
+The only section that needs plotly. The warm_* functions build the caches
+this page reads (and its default view, under the same cache keys), for
+warmup.py to run after a cold start.
+"""
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from backends import BACKEND
+from chart_cache import cache_key, cached, filter_state
+from config import ALL_DEBRIS_ITEMS, DEBRIS_GROUPS
+from filter_index import FILTER_COLUMNS
+from perf import span
+from rollups import COUNT_COL, material_totals, subcategory_counts
+from trends import LEVELS, METRICS as TREND_METRICS, MONTH_COL, get_trends
+from units import EFFORT_METRICS, effort_metrics
+from views.common import ROZALIA_PALETTE, get_backend, load_data
+
+DEFAULT_GROUPS = ["Year"]
+
+
+def material_figure(plot_df, chart_type):
+    """The MATERIAL TYPE chart from rollups.material_totals output."""
+    if chart_type == "Pie Chart":
+        pie_df = plot_df.groupby('Material')['Count'].sum().reset_index()
+        pie_df = pie_df[pie_df['Count'] > 0] 
+        fig = px.pie(pie_df, values='Count', names='Material', hole=0.4, template="simple_white", color_discrete_sequence=ROZALIA_PALETTE)
+        fig.update_traces(hovertemplate="<b>%{label}</b><br>Total: %{value:,}<extra></extra>")
+    else:
+        fig = px.bar(plot_df, x='X_Axis', y='Count', color='Material', template="simple_white", color_discrete_sequence=ROZALIA_PALETTE, barmode='stack', category_orders={"X_Axis": sorted(plot_df['X_Axis'].unique())}, custom_data=[plot_df['Count']])
+        fig.update_traces(hovertemplate="<b>%{fullData.name}</b><br>Total: %{customdata[0]:,} pieces<br>Share: %{y:.1f}%<extra></extra>")
+        fig.update_layout(barnorm='percent', yaxis_title="PROPORTION (%)")
+
+    fig.update_layout(xaxis_title=None, font_family="Avenir")
+    return fig
+
+
+def subcategory_figure(sub_df, chart_type):
+    """The SUBCATEGORY BREAKDOWNS chart from rollups.subcategory_counts output."""
+    if chart_type == "Pie Chart":
+        sub_total = sub_df['Count'].sum()
+        pie_sub_df = sub_df.groupby('Item')['Count'].sum().reset_index()
+        fig = px.pie(pie_sub_df, values='Count', names='Item', hole=0.4, color_discrete_sequence=ROZALIA_PALETTE)
+        fig.update_layout(annotations=[dict(text=f'{int(sub_total):,}<br>total', x=0.5, y=0.5, font_size=20, showarrow=False)])
+        fig.update_traces(hovertemplate="<b>%{label}</b><br>Count: %{value:,} pieces<br>%{percent}<extra></extra>")
+    else:
+        # Fixed the length-mismatch crash logic by passing custom_data directly into the constructor
+        fig = px.bar(
+            sub_df, x='X_Axis', y='Count', color='Item',
+            template="simple_white", color_discrete_sequence=ROZALIA_PALETTE,
+            category_orders={"X_Axis": sorted(sub_df['X_Axis'].unique())},
+            custom_data=['Count']
+        )
+        fig.update_layout(barnorm='percent', yaxis_title="PROPORTION (%)")
+        fig.update_traces(hovertemplate="<b>%{fullData.name}</b><br>Count: %{customdata[0]:,} pieces<br>Share: %{y:.1f}%<extra></extra>")
+    
+    fig.update_layout(xaxis_title=None, font_family="Avenir")
+    return fig
+
+
+def effort_figure(g_df, metric):
+    """Bar of one units.EFFORT_METRICS rate per X_Axis group, or None when no group has the data."""
+    metrics = effort_metrics(g_df)
+    if metric not in metrics.columns:
+        return None
+    rates = pd.DataFrame({'X_Axis': g_df['X_Axis'], metric: metrics[metric]}).dropna()
+    if rates.empty:
+        return None
+    fig = px.bar(rates, x='X_Axis', y=metric, template="simple_white", color_discrete_sequence=ROZALIA_PALETTE, category_orders={"X_Axis": sorted(rates['X_Axis'].unique())})
+    fig.update_traces(hovertemplate="<b>%{x}</b><br>" + metric + ": %{y:,.1f}<extra></extra>")
+    fig.update_layout(xaxis_title=None, yaxis_title=metric.upper(), font_family="Avenir")
+    return fig
+
+
+def trend_figure(series_df, level, metric):
+    """Monthly line per site/state from trends.MonthlyRollups.series output."""
+    fig = px.line(series_df, x=MONTH_COL, y=metric, color=level, markers=True, template="simple_white", color_discrete_sequence=ROZALIA_PALETTE)
+    fig.update_traces(hovertemplate="<b>%{fullData.name}</b><br>%{x|%b %Y}: %{y:,.1f}<extra></extra>")
+    fig.update_layout(xaxis_title=None, yaxis_title=metric.upper(), font_family="Avenir")
+    return fig
+
+
+# --- WARM-UP (see warmup.py) ---
+def default_view(data_version):
+    """The Dashboard's cache-key view on first load: no filters, no site search, grouped by Year."""
+    return (data_version, {}, DEFAULT_GROUPS, "", BACKEND)
+
+
+def warm_indexes(df, data_version, backend):
+    """Builds the cube and its filter/search indexes (or warms the SQL backend)."""
+    queries = backend.queries(df, data_version)
+    for col in FILTER_COLUMNS:
+        queries.options(col, {})
+
+
+def warm_default_view(df, data_version, backend):
+    """Aggregations and figures of the default view's first tab of each kind."""
+    view = default_view(data_version)
+    queries = backend.queries(df, data_version)
+    first_cat, first_metric = next(iter(DEBRIS_GROUPS)), next(iter(EFFORT_METRICS))
+    g_df = cached(cache_key("rollup", *view), lambda: queries.rollup({}, DEFAULT_GROUPS))
+    plot_df = cached(cache_key("material totals", *view), lambda: material_totals(g_df))
+    cached(cache_key("material figure", "Stacked Bar", *view), lambda: material_figure(plot_df, "Stacked Bar"))
+    sub_df = cached(cache_key("subcategory counts", first_cat, *view), lambda: subcategory_counts(g_df, first_cat))
+    if not sub_df.empty:
+        cached(cache_key("subcategory figure", first_cat, "Stacked Bar", *view), lambda: subcategory_figure(sub_df, "Stacked Bar"))
+    cached(cache_key("effort figure", first_metric, *view), lambda: effort_figure(g_df, first_metric))
+
+
+def warm_trends(df, data_version, backend):
+    """The monthly rollups and the default trend chart (top sites, first metric)."""
+    rollups = get_trends(df, data_version)
+    level, metric = LEVELS[0], next(iter(TREND_METRICS))
+    keys = rollups.top(level)
+    if keys:
+        cached(cache_key("trend figure", data_version, level, sorted(keys), metric),
+               lambda: trend_figure(rollups.series(level, keys, metric), level, metric))
+
+
+def render():
+    st.title("DATA DASHBOARD")
+
+    df, data_version = load_data()
+    if df.empty:
+        st.error("Critical Error: Master Database File Missing or Corrupted.")
+        return
+
+    # Filters, option lists and group-bys run on the pre-aggregated cube (or as SQL on a local database)
+    queries = get_backend().queries(df, data_version)
+
+    st.markdown("### DATA CONTROLS")
+    st.markdown("**STEP 1: FILTER DATA**")
+
+    r1_c1, r1_c2, r1_c3, r1_c4 = st.columns(4)
+    r2_c1, r2_c2, r2_c3, r2_c4 = st.columns(4)
+    r3_c1, r3_c2, r3_c3, r3_c4 = st.columns(4)
+
+    type_loc_col = "Type of location (i.e. Sandy Beach, Marina, Open Water)"
+    # Updated to query the precise field key mapping name without crashing
+    org_col = "Name of Organization/Individual"
+    filter_widgets = [
+        ("State", r1_c1, "SELECT STATE"),
+        ("City", r1_c2, "SELECT CITY"),
+        ("Location", r1_c3, "SELECT LOCATION"),
+        ("Year", r1_c4, "SELECT YEAR"),
+        ("Month", r2_c1, "SELECT MONTH"),
+        ("Type of cleanup", r2_c2, "SELECT TYPE OF CLEANUP"),
+        (type_loc_col, r2_c3, "SELECT TYPE OF LOCATION"),
+        (org_col, r3_c1, "SELECT ORGANIZATION/INDIVIDUAL"),
+    ]
+
+    # Each select only offers values still present after the search and the filters before it
+    site_q = r3_c2.text_input("FIND A SITE (LOCATION, CITY OR ORG)", "").strip()
+    selections = {}
+    for col, widget_col, label in filter_widgets:
+        with span("dashboard: filter options"):
+            opts = queries.options(col, selections, site_q)
+        selections[col] = widget_col.multiselect(label, options=opts)
+
+    st.markdown("**STEP 2: GROUP DATA BY**")
+    group_options = ["Year", "Month", "State", "Type of cleanup"]
+    selected_groups = st.multiselect("GROUP BY:", options=group_options, default=DEFAULT_GROUPS, label_visibility="collapsed")
+
+    # Shared across sessions: the same view is only aggregated and drawn once per data version
+    view = (data_version, filter_state(selections), selected_groups, site_q, BACKEND)
+    with span("dashboard: rollup"):
+        g_df = cached(cache_key("rollup", *view),
+                      lambda: queries.rollup(selections, selected_groups, site_q)) if selected_groups else None
+    if g_df is None or g_df.empty:
+        st.warning("No records match these filters or no grouping selected.")
+    else:
+        n_cleanups = int(g_df[COUNT_COL].sum())
+        total_pieces = int(g_df[ALL_DEBRIS_ITEMS].sum().sum())
+        m1, m2, m3 = st.columns(3)
+        m1.metric("CLEANUPS", f"{n_cleanups:,}")
+        m2.metric("TOTAL PIECES", f"{total_pieces:,}")
+        m3.metric("AVG PIECES", f"{int(total_pieces / n_cleanups) if n_cleanups > 0 else 0:,}")
+
+        # Density metrics from the summed kg/km/participant-hours in the rollup (units.py)
+        overall = effort_metrics(g_df.sum(numeric_only=True).to_frame().T).iloc[0]
+        e1, e2, e3 = st.columns(3)
+        for e_col, name in zip((e1, e2, e3), EFFORT_METRICS):
+            e_col.metric(name.upper(), "n/a" if pd.isna(overall.get(name)) else f"{overall[name]:,.1f}")
+
+        tab_main, tab_sub, tab_effort, tab_trend = st.tabs(["TOTAL COLLECTIONS", "SUBCATEGORY BREAKDOWNS", "EFFORT & DENSITY", "TRENDS OVER TIME"])
+
+        with tab_main:
+            st.subheader("MATERIAL TYPE")
+            with span("dashboard: chart data"):
+                plot_df = cached(cache_key("material totals", *view), lambda: material_totals(g_df))
+            main_chart_type = st.radio("VIEW TOTALS AS:", ["Stacked Bar", "Pie Chart"], horizontal=True, key="main_toggle")
+
+            with span("dashboard: figure build"):
+                fig_stack = cached(cache_key("material figure", main_chart_type, *view),
+                                   lambda: material_figure(plot_df, main_chart_type))
+            with span("dashboard: render chart"):
+                st.plotly_chart(fig_stack, use_container_width=True)
+
+        with tab_sub:
+            st.subheader("SUBCATEGORY BREAKDOWNS")
+            target_cat = st.selectbox("CHOOSE A SUBCATEGORY:", options=list(DEBRIS_GROUPS.keys()))
+            with span("dashboard: chart data"):
+                sub_df = cached(cache_key("subcategory counts", target_cat, *view),
+                                lambda: subcategory_counts(g_df, target_cat))
+
+            if sub_df.empty:
+                st.info(f"No active {target_cat} items found for this selection.")
+            else:
+                sub_total = sub_df['Count'].sum()
+
+                st.markdown(f"**Total {target_cat} pieces found: {int(sub_total):,}**")
+                chart_type = st.radio("VIEW AS:", ["Stacked Bar", "Pie Chart"], horizontal=True, key="sub_toggle")
+
+                with span("dashboard: figure build"):
+                    fig_sub = cached(cache_key("subcategory figure", target_cat, chart_type, *view),
+                                     lambda: subcategory_figure(sub_df, chart_type))
+                with span("dashboard: render chart"):
+                    st.plotly_chart(fig_sub, use_container_width=True)
+
+        with tab_effort:
+            st.subheader("EFFORT & DENSITY")
+            effort_metric = st.selectbox("METRIC:", options=list(EFFORT_METRICS.keys()))
+            with span("dashboard: figure build"):
+                fig_effort = cached(cache_key("effort figure", effort_metric, *view),
+                                    lambda: effort_figure(g_df, effort_metric))
+            if fig_effort is None:
+                st.info("No cleanups in this selection reported the weight, distance or effort this metric needs.")
+            else:
+                with span("dashboard: render chart"):
+                    st.plotly_chart(fig_effort, use_container_width=True)
+
+        with tab_trend:
+            st.subheader("MONTHLY TRENDS")
+            # Reads only the materialized monthly rollups, never the raw archive
+            trend_rollups = get_trends(df, data_version)
+            t1, t2, t3 = st.columns([1, 3, 2])
+            trend_level = t1.radio("PER", LEVELS, horizontal=True)
+            trend_options = trend_rollups.options(trend_level)
+            # selected sites with only undated rows have no trend, and Streamlit rejects defaults outside the options
+            available = set(trend_options)
+            trend_default = [v for v in selections.get(trend_level) or [] if v in available]
+            trend_keys = t2.multiselect(
+                f"SELECT {trend_level.upper()}", options=trend_options,
+                default=trend_default or trend_rollups.top(trend_level),
+            )
+            trend_metric = t3.selectbox("METRIC", options=list(TREND_METRICS.keys()))
+
+            if not trend_keys:
+                st.info(f"Choose at least one {trend_level.lower()} to plot.")
+            else:
+                with span("dashboard: figure build"):
+                    fig_trend = cached(
+                        cache_key("trend figure", data_version, trend_level, sorted(trend_keys), trend_metric),
+                        lambda: trend_figure(trend_rollups.series(trend_level, trend_keys, trend_metric), trend_level, trend_metric),
+                    )
+                with span("dashboard: render chart"):
+                    st.plotly_chart(fig_trend, use_container_width=True)
+
+        st.markdown("---")
+        with st.expander("View tabular data for this selection"):
+            # Raw rows are only needed here, filtered once with the same selections
+            with span("dashboard: preview table"):
+                preview_df = queries.rows(selections, site_q)
+                if 'Date' in preview_df.columns:
+                    preview_df = preview_df.assign(Date=preview_df['Date'].dt.strftime('%Y-%m-%d').fillna("Unknown"))
+                st.dataframe(preview_df, use_container_width=True)
+
+            st.download_button(
+                label="DOWNLOAD FILTERED CSV",
+                data=preview_df.to_csv(index=False).encode('utf-8-sig'),
+                file_name="filtered_cleanup_data.csv",
+                mime="text/csv"
+            )
@@ -0,0 +1,61 @@
+# views/history.py
+"""CLEANUP DATA ARCHIVE: searchable, sortable, paged view of every cleanup with CSV export."""
+import streamlit as st
+
+from config import DEBRIS_GROUPS
+from master import DERIVED_COLUMNS
+from paging import PAGE_SIZES, SORT_KEYS, apply_mask, export_csv, page_count, page_frame, sort_order, visible_columns
+from perf import span
+from search_index import SEARCH_MODES, get_search_index
+from sites import ID_COLUMNS
+from views.common import load_data
+
+
+def render():
+    st.title("CLEANUP DATA ARCHIVE")
+
+    df, data_version = load_data()
+    if df.empty:
+        st.error("Critical Error: Master Database File Missing or Corrupted.")
+    else:
+        s1, s2 = st.columns([3, 1])
+        search_q = s1.text_input("SEARCH BY LOCATION, CITY OR ORGANIZATION", "").strip()
+        search_mode = s2.radio("MATCH", SEARCH_MODES, horizontal=True,
+                               format_func={"contains": "Contains", "prefix": "Starts with", "fuzzy": "Fuzzy"}.get)
+        # Trigram index lookup instead of scanning every row per keystroke
+        with span("history: search"):
+            mask = get_search_index(df, data_version).mask(search_q, search_mode)
+
+        v1, v2, v3, v4 = st.columns(4)
+        sort_key = v1.selectbox("SORT BY", options=SORT_KEYS, index=0)
+        ascending = v2.radio("ORDER", ["Newest/Z-A first", "Oldest/A-Z first"], horizontal=True) == "Oldest/A-Z first"
+        page_size = v3.selectbox("ROWS PER PAGE", options=PAGE_SIZES, index=1)
+        show_groups = v4.multiselect("SHOW ITEM COLUMNS FOR", options=list(DEBRIS_GROUPS.keys()))
+
+        # Only positions are sorted/filtered; rows are sliced out for the visible page alone
+        with span("history: sort"):
+            positions = apply_mask(sort_order(df, data_version, sort_key, ascending), mask)
+        n_pages = page_count(len(positions), page_size)
+
+        st.markdown(f"**RECORD COUNT:** {len(positions)}")
+        page_no = st.number_input(f"PAGE (OF {n_pages})", min_value=1, max_value=n_pages, value=1, step=1)
+        with span("history: render page"):
+            # Outlier flags are precomputed on the master frame once per data version
+            display_df = page_frame(df, positions, page_no, page_size, visible_columns(show_groups))
+            st.dataframe(display_df, use_container_width=True)
+
+        # The full CSV is only built when someone asks for it
+        export_key = (data_version, search_q, search_mode, sort_key, ascending)
+        if st.session_state.get("history_export_key") != export_key:
+            st.session_state.pop("history_export", None)
+        if "history_export" not in st.session_state:
+            if st.button("PREPARE CSV EXPORT"):
+                st.session_state["history_export"] = export_csv(df.drop(columns=DERIVED_COLUMNS + ID_COLUMNS), positions)
+                st.session_state["history_export_key"] = export_key
+        if "history_export" in st.session_state:
+            st.download_button(
+                label="EXPORT CSV", 
+                data=st.session_state["history_export"], 
+                file_name="cleanup_archive.csv", 
+                mime="text/csv"
+            )
@@ -0,0 +1,261 @@
+# views/new_entry.py
+"""
+DATA ENTRY FORM: one cleanup per submission, or several at once in a grid.
+
+The grid is an editable table with one row per cleanup and a column per
+field in config.ALL_COLUMNS (summary totals, the Outlier flag and the
+timestamp are filled in, not typed). Rows are checked with bulk_import's
+validation as they are typed, their totals shown, and a submit queues them
+all together, so they go out in one batched append. Two grid rows for the
+same cleanup (the submission queue's dedupe fields) are rejected while
+typing, so nothing is dropped after the grid is cleared.
+
+Neither drawing nor submitting touches the archive. A submit flags the new
+rows with the outlier stats if another page has already fitted them for the
+current data version (otherwise Outlier is left blank, and the master frame
+flags the row once it is synced), then hands them to the background
+submission queue.
+"""
+from datetime import datetime, date
+
+import pandas as pd
+import streamlit as st
+
+from bulk_import import prepare_chunk
+from config import ALL_COLUMNS, ALL_DEBRIS_ITEMS, DEBRIS_GROUPS, METADATA_FIELDS, SUMMARY_TOTALS, DROPDOWN_OPTIONS, REQUIRED_FIELDS
+from perf import span
+from totals import TOTAL_COLUMNS, row_totals
+from views.common import get_submissions
+
+ENTRY_MODES = ["Single cleanup", "Several cleanups (grid)"]
+GRID_FIELDS = [c for c in ALL_COLUMNS if c not in SUMMARY_TOTALS + ["Outlier", "Submission Timestamp"]]
+GRID_ROWS = 5
+DECIMAL_FIELDS = ["Total weight", "Distance cleaned", "Duration (hrs)"]
+
+
+def _flag_outliers(rows):
+    """Outlier flags for a frame of new rows from the cached detector, "" if none is fitted yet (never loads data)."""
+    with span("entry: outlier flag"):
+        from outliers import cached_detector
+        from snapshot import current_snapshot
+
+        snapshot = current_snapshot()
+        detector = cached_detector(snapshot.version) if snapshot is not None else None
+        if detector is None:
+            return pd.Series("", index=rows.index, dtype=object)
+        return detector.flag(rows)
+
+
+def render():
+    st.title("DATA ENTRY FORM")
+
+    st.markdown(
+        """
+        <style>
+        div[data-testid="InputInstructions"] { display: none; }
+        </style>
+        """,
+        unsafe_allow_html=True
+    )
+
+    st.components.v1.html(
+        """
+        <script>
+        const doc = window.parent.document;
+        doc.addEventListener('keydown', function(e) {
+            if (e.keyCode === 13 && e.target.tagName !== 'TEXTAREA') {
+                e.preventDefault();
+                e.stopImmediatePropagation();
+            }
+        }, true);
+        </script>
+        """,
+        height=0,
+    )
+
+    mode = st.radio("ENTRY MODE", ENTRY_MODES, horizontal=True, label_visibility="collapsed")
+    if mode == ENTRY_MODES[0]:
+        render_form()
+    else:
+        render_grid()
+
+
+def render_form():
+    with st.form("entry_form", clear_on_submit=False):
+        st.subheader("1. CLEANUP DETAILS")
+        meta_in = {}
+
+        # Filter out Outlier and Submission Timestamp from manual user input fields
+        fields_to_show = [f for f in METADATA_FIELDS if f not in ["Outlier", "Submission Timestamp"]]
+        for i in range(0, len(fields_to_show), 3):
+            row_cols = st.columns(3)
+            for j, field in enumerate(fields_to_show[i:i+3]):
+                c = row_cols[j]
+                display_label = field.upper().replace("#", "NUMBER")
+                if field in REQUIRED_FIELDS:
+                    display_label = f"{display_label} :red[*]"
+
+                f_key = f"meta_{field}"
+
+                if field in DROPDOWN_OPTIONS:
+                    meta_in[field] = c.selectbox(display_label, options=DROPDOWN_OPTIONS[field], index=None, key=f_key)
+                elif "Date" in field:
+                    meta_in[field] = c.date_input(display_label, date.today(), key=f_key)
+                elif field in ["Total weight", "Distance cleaned", "Duration (hrs)"]:
+                    meta_in[field] = c.number_input(display_label, min_value=0.0, step=0.1, value=0.0, key=f_key)
+                elif "Participants" in field or "#" in field:
+                    meta_in[field] = c.number_input(display_label, min_value=0, step=1, value=0, key=f_key)
+                else:
+                    meta_in[field] = c.text_input(display_label, key=f_key)
+
+        st.markdown("---")
+
+        st.subheader("2. DEBRIS QUANTIFICATION")
+        counts = {}
+        tabs = st.tabs([k.upper() for k in DEBRIS_GROUPS.keys()])
+        for i, (group_name, items) in enumerate(DEBRIS_GROUPS.items()):
+            with tabs[i]:
+                d_cols = st.columns(3)
+                for j, item in enumerate(items):
+                    counts[item] = d_cols[j % 3].number_input(item, min_value=0, step=1, value=0, key=f"count_{item}")
+
+        st.markdown("---")
+
+        st.subheader("3. SUBMIT ENTRY")
+        st.info("**Done entering in your cleanup?**")
+        submit_col1, submit_col2 = st.columns([1, 3])
+        submitted = submit_col1.form_submit_button("SUBMIT DATA")
+
+        if submitted:
+            missing_fields = [r for r in REQUIRED_FIELDS if not meta_in.get(r)]
+            if missing_fields:
+                st.error(f"⚠️ **Missing required fields:** {', '.join(missing_fields)}")
+            else:
+                cleaned_meta = {}
+                for field, val in meta_in.items():
+                    if val is not None and str(val).strip() != "":
+                        cleaned_meta[field] = val
+                    else:
+                        cleaned_meta[field] = "None"
+
+                cleaned_counts = {k: (v if v is not None else 0) for k, v in counts.items()}
+                new_row = {**cleaned_meta, **cleaned_counts}
+
+                new_row["Date"] = pd.to_datetime(meta_in["Date"]).strftime('%Y-%m-%d')
+
+                # Track precisely when this specific entry hits the server backend
+                new_row["Submission Timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+                # Group category sums, driven by config.SUMMARY_TOTAL_SOURCES
+                new_row.update(row_totals(cleaned_counts))
+
+                # Flag the row with the cached outlier stats so the sheet carries it too
+                new_row["Outlier"] = _flag_outliers(pd.DataFrame([new_row])).iloc[0]
+
+                # Queued for the background writer, which batches concurrent submissions into one append
+                ticket = get_submissions().submit(new_row)
+                if ticket.status == "duplicate":
+                    st.warning("This cleanup (same email, date, location and type of cleanup) was already submitted, "
+                               "so it wasn't saved twice.")
+                else:
+                    st.success("Submission received! It will show up in the archive within a few seconds.")
+                    st.balloons()
+
+
+# --- GRID MODE ---
+def empty_grid(n_rows=GRID_ROWS):
+    """A blank grid of GRID_FIELDS, typed so the editor offers dates, whole numbers and decimals."""
+    grid = pd.DataFrame(index=range(n_rows))
+    for field in GRID_FIELDS:
+        if "Date" in field:
+            dtype = "datetime64[ns]"
+        elif field in DECIMAL_FIELDS:
+            dtype = "Float64"
+        elif field in ALL_DEBRIS_ITEMS or "Participants" in field or "#" in field:
+            dtype = "Int64"
+        else:
+            dtype = "string"
+        grid[field] = pd.Series(index=grid.index, dtype=dtype)
+    return grid
+
+
+def grid_column_config():
+    """Dropdown columns from DROPDOWN_OPTIONS, dates, and non-negative numbers, as in the single form."""
+    config = {}
+    for field in GRID_FIELDS:
+        label = f"{field} *" if field in REQUIRED_FIELDS else field
+        if field in DROPDOWN_OPTIONS:
+            config[field] = st.column_config.SelectboxColumn(label, options=DROPDOWN_OPTIONS[field])
+        elif "Date" in field:
+            config[field] = st.column_config.DateColumn(label, format="YYYY-MM-DD")
+        elif field in DECIMAL_FIELDS:
+            config[field] = st.column_config.NumberColumn(label, min_value=0.0, step=0.1)
+        elif field in ALL_DEBRIS_ITEMS or "Participants" in field or "#" in field:
+            config[field] = st.column_config.NumberColumn(label, min_value=0, step=1)
+        else:
+            config[field] = st.column_config.TextColumn(label)
+    return config
+
+
+def prepare_grid(grid):
+    """
+    Validates edited grid rows with bulk_import.prepare_chunk. Blank rows are
+    ignored. Returns (accepted rows laid out like the master log with totals
+    filled in, rejected rows with "Row" (1-based grid row) and "Reason").
+    A row repeating an earlier row's dedupe fields is rejected too.
+    """
+    from submissions import DEDUPE_FIELDS, dedupe_key
+
+    text = pd.DataFrame(index=grid.index)
+    for field in GRID_FIELDS:
+        values = grid[field]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            text[field] = values.dt.strftime("%Y-%m-%d")
+        else:
+            text[field] = values.astype("string")
+    accepted, rejected = prepare_chunk(text, {field: field for field in GRID_FIELDS}, first_row=1)
+
+    first_with_key, repeat_of = {}, {}
+    for i, row in zip(accepted.index, accepted[DEDUPE_FIELDS].to_dict("records")):
+        repeat_of[i] = first_with_key.setdefault(dedupe_key(row), i)
+    repeats = [i for i, first in repeat_of.items() if first != i]
+    if repeats:
+        repeated = accepted.loc[repeats]
+        repeated.insert(0, "Reason", [f"same {', '.join(DEDUPE_FIELDS)} as row {repeat_of[i] + 1}" for i in repeats])
+        repeated.insert(0, "Row", repeated.index + 1)
+        rejected = pd.concat([rejected, repeated]).sort_values("Row")
+        accepted = accepted.drop(repeats)
+    return accepted, rejected
+
+
+def render_grid():
+    st.info("One row per cleanup. Required columns are marked with *; summary totals are added for you. "
+            "Add rows with the + at the bottom of the table.")
+    # A new editor key after each submit starts a fresh, empty grid
+    grid_key = f"entry_grid_{st.session_state.get('entry_grid_no', 0)}"
+    grid = st.data_editor(empty_grid(), key=grid_key, num_rows="dynamic", column_config=grid_column_config(),
+                          hide_index=True, use_container_width=True)
+
+    accepted, rejected = prepare_grid(grid)
+    if accepted.empty and rejected.empty:
+        return
+
+    if len(rejected):
+        st.error(f"⚠️ **{len(rejected)} row(s) need fixing before anything can be submitted:**")
+        st.dataframe(rejected[["Row", "Reason"]], hide_index=True, use_container_width=True)
+    if len(accepted):
+        st.markdown(f"**{len(accepted)} CLEANUP(S) READY, {int(accepted['Total (All)'].sum()):,} PIECES IN TOTAL**")
+        summary = accepted[["Date", "Location", "City"] + TOTAL_COLUMNS]
+        st.dataframe(summary, hide_index=True, use_container_width=True)
+
+    if st.button(f"SUBMIT {len(accepted)} CLEANUP(S)", disabled=accepted.empty or len(rejected) > 0):
+        accepted["Outlier"] = _flag_outliers(accepted)
+        # Queued together, so the writer sends every row in one append
+        tickets = get_submissions().submit_many(accepted.astype(object).to_dict("records"))
+        duplicates = sum(t.status == "duplicate" for t in tickets)
+        st.session_state["entry_grid_no"] = st.session_state.get("entry_grid_no", 0) + 1
+        st.success(f"{len(tickets) - duplicates} submission(s) received! They will show up in the archive within a few seconds.")
+        if duplicates:
+            st.warning(f"{duplicates} row(s) repeat a cleanup (same email, date, location and type of cleanup) "
+                       "that was already submitted, so they weren't saved twice.")
+        st.balloons()
@@ -0,0 +1,71 @@
+# warmup.py
+"""
+Cache warm-up for the first session after a cold start.
+
+A freshly started process has a snapshot to load and every per-version cache
+(outlier stats, filter and search indexes, the rollup cube, the monthly
+trends, the default Dashboard chart) still to build, and without this the
+first person to open each section pays for it. The app calls warm_up() on
+every run with a function that lists named build steps; only the first call
+in the process calls it and runs the steps in a background thread, so that
+session renders as usual while the rest gets built, and later calls do
+nothing. main.py's wake probe loads the app after waking it, which makes
+that first session a robot's rather than a user's.
+
+Steps are timed as a "Warm-up" run, so they show up next to the page
+timings in the Admin panel. ROZALIA_WARMUP=0 turns warm-up off.
+"""
+import os
+import threading
+import time
+
+from perf import begin_run, end_run, span
+
+ENABLED = os.environ.get("ROZALIA_WARMUP", "1") != "0"
+PAGE = "Warm-up"
+
+_LOCK = threading.Lock()
+_STATUS = {"state": "not started", "steps": {}, "error": None}
+
+
+def _run(steps):
+    begin_run()
+    try:
+        for name, build in steps:
+            start = time.perf_counter()
+            with span(f"warm-up: {name}"):
+                build()
+            _STATUS["steps"][name] = time.perf_counter() - start
+        _STATUS["state"] = "done"
+    except Exception as e:  # a failed step only means the first visitor builds it instead
+        _STATUS["state"], _STATUS["error"] = "failed", repr(e)
+    finally:
+        end_run(PAGE)
+
+
+def warm_up(make_steps, background=True):
+    """
+    Once per process: calls `make_steps()` (on the calling thread) for a list
+    of (name, fn) and runs them in order. Returns the worker thread, or None
+    when it ran inline, already ran, or warm-up is off.
+    """
+    with _LOCK:
+        if not ENABLED or _STATUS["state"] != "not started":
+            return None
+        _STATUS["state"] = "running"
+    try:
+        steps = make_steps()
+    except Exception as e:
+        _STATUS["state"], _STATUS["error"] = "failed", repr(e)
+        return None
+    if not background:
+        _run(steps)
+        return None
+    worker = threading.Thread(target=_run, args=(list(steps),), name="rozalia-warmup", daemon=True)
+    worker.start()
+    return worker
+
+
+def warmup_status():
+    """State ("not started", "running", "done", "failed"), seconds per finished step, error."""
+    return {**_STATUS, "steps": dict(_STATUS["steps"])}